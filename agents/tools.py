@@ -1,14 +1,47 @@
 import os
 from dotenv import load_dotenv
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from langchain_core.tools import tool
 
 load_dotenv(override=True)
 
+DEFAULT_FALLBACK_MODEL = "models/fallback_pricer.npz"
+
+_fallback_pricer = None
+
+def load_fallback_pricer() -> Optional[Any]:
+    """
+    The local CPU price model (python -m pricer.fallback fit), or None if there is no model file.
+    Only a loaded model is kept, so a file added after startup is picked up on the next failure
+    """
+    global _fallback_pricer
+    if _fallback_pricer is None:
+        path = os.getenv("FALLBACK_PRICE_MODEL", DEFAULT_FALLBACK_MODEL)
+        if not os.path.exists(path):
+            return None
+        from pricer.fallback import FallbackPricer
+        _fallback_pricer = FallbackPricer.load(path)
+    return _fallback_pricer
+
+def fallback_price(content: str, reason: str) -> float:
+    """
+    Prices content locally when the Modal API fails; raises the API error if there is no local model.
+    The model was trained on the GPT-rewritten summaries the Modal endpoint prices, while content
+    here is the user's text as-is (normalized the same way, but not rewritten), so expect it to be
+    less accurate than the endpoint: it keeps the comparison going rather than replacing it
+    """
+    try:
+        model = load_fallback_pricer()
+    except Exception as e:
+        raise Exception(f"{reason}; fallback model failed to load: {e}")
+    if model is None:
+        raise Exception(reason)
+    return model.predict(content)
+
 @tool
 def predict_price_tool(content: str) -> float:
-    """Predict price using the Modal API endpoint"""
+    """Predict price using the Modal API endpoint, falling back to the local CPU model if it fails"""
     modal_url = os.getenv("MODAL_URL")
     try:
         print(f"Calling Modal API: {modal_url}/predict")
@@ -30,22 +63,25 @@ def predict_price_tool(content: str) -> float:
             price = float(result["price"])
             print(f"Extracted price: {price}")
             return price
-        else:
-            print(f"No 'price' key in response: {result}")
-            raise Exception("Price API not working - no price in response")
+        print(f"No 'price' key in response: {result}")
+        reason = "Price API not working - no price in response"
             
     except requests.exceptions.Timeout:
         print("Request timed out after 120 seconds")
-        raise Exception("Price API not working - request timed out")
+        reason = "Price API not working - request timed out"
     except requests.exceptions.RequestException as e:
         print(f"Request error: {e}")
-        raise Exception("Price API not working - request failed")
+        reason = "Price API not working - request failed"
     except (ValueError, KeyError) as e:
         print(f"Response parsing error: {e}")
-        raise Exception("Price API not working - invalid response format")
+        reason = "Price API not working - invalid response format"
     except Exception as e:
         print(f"Unexpected error: {e}")
-        raise Exception("Price API not working")
+        reason = "Price API not working"
+
+    # Outside the try, so a missing local model raises this reason instead of
+    # landing in the generic handler and being retried
+    return fallback_price(content, reason)
 
 @tool
 def search_web_tool(query: str) -> List[Dict[str, Any]]:
@@ -0,0 +1,195 @@
+# ===============================
+# Cold-Start Model Artifact
+# ===============================
+# Prepares a ready-to-load checkpoint once (adapter merged, already quantized
+# for CUDA, tokenizer alongside) so containers skip the adapter download and
+# the bitsandbytes requantization; loading memory-maps its safetensors.
+#   python artifact.py prepare --output /root/.cache/huggingface/artifacts/<run>
+# Locally, with a small model and a directory standing in for the volume:
+#   python artifact.py prepare --model HuggingFaceTB/SmolLM2-135M --device cpu --output /tmp/volume/smol
+#   python artifact.py load /tmp/volume/smol --device cpu
+# Then set run.artifact in eval_config.yaml to the artifact directory.
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from eval_config import CFG, get_device, get_project_run_name
+from eval_model import get_precision, get_quant_config, quantize_for_cpu
+
+MANIFEST = "artifact.json"
+FORMAT_VERSION = 1
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def default_artifact_dir(root):
+    """One artifact per run and revision under root, e.g. the cache volume"""
+    return Path(root) / f"{get_project_run_name()}@{CFG['run']['revision'] or 'main'}"
+
+
+@contextmanager
+def timed(phases, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = time.perf_counter() - start
+
+
+# ===============================
+# Prepare
+# ===============================
+def prepare_artifact(output_dir, model_name=None, device=None):
+    """
+    Writes the artifact to output_dir. The source is model_name if given,
+    else run.merged_model, else the run's adapter merged into the base model.
+    On CUDA the weights are quantized with the eval config's bitsandbytes
+    settings before saving, so loading reads int8/nf4 tensors as they are.
+    CPU artifacts hold float32 weights; dynamic int8 is applied at load
+    """
+    from merge_adapter import merge_adapter
+
+    start = time.perf_counter()
+    device = device or get_device()
+    output_dir = Path(output_dir)
+    staging = output_dir.with_name(output_dir.name + ".partial")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    source = model_name or CFG["run"]["merged_model"]
+    source_name = str(source) if source else f"{get_project_run_name()}@{CFG['run']['revision'] or 'main'}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not source:
+            source = merge_adapter(Path(tmp) / "merged", revision=CFG["run"]["revision"], dtype="float32" if device == "cpu" else "bfloat16")
+
+        if device == "cuda":
+            use_bf16 = get_precision()
+            model = AutoModelForCausalLM.from_pretrained(
+                source,
+                quantization_config=get_quant_config(use_bf16),
+                device_map="auto",
+            )
+            quantization = "nf4" if CFG["quantization"]["use_4bit"] else "int8"
+        else:
+            model = AutoModelForCausalLM.from_pretrained(source, torch_dtype=torch.float32)
+            quantization = "none"
+
+        tokenizer = AutoTokenizer.from_pretrained(source)
+        model.generation_config.pad_token_id = tokenizer.eos_token_id
+        model.save_pretrained(staging, safe_serialization=True)
+        tokenizer.save_pretrained(staging)
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "source": source_name,
+        "device": device,
+        "quantization": quantization,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": {
+            str(path.relative_to(staging)): path.stat().st_size for path in sorted(staging.rglob("*")) if path.is_file()
+        },
+    }
+    (staging / MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    staging.rename(output_dir)
+
+    print(f"Prepared {device} artifact ({quantization}) at {output_dir} in {time.perf_counter() - start:.1f}s")
+    return manifest
+
+
+# ===============================
+# Load
+# ===============================
+def read_manifest(artifact_dir):
+    """The manifest, after checking every listed file is present with its recorded size"""
+    artifact_dir = Path(artifact_dir)
+    path = artifact_dir / MANIFEST
+    if not path.exists():
+        raise ArtifactError(f"No {MANIFEST} in {artifact_dir}; run artifact.py prepare first")
+    manifest = json.loads(path.read_text())
+    if manifest["format"] != FORMAT_VERSION:
+        raise ArtifactError(f"{artifact_dir} is format {manifest['format']}, expected {FORMAT_VERSION}")
+    for relative, size in manifest["files"].items():
+        file = artifact_dir / relative
+        if not file.exists() or file.stat().st_size != size:
+            raise ArtifactError(f"{file} is missing or incomplete")
+    return manifest
+
+
+class ArtifactLoader:
+    """
+    Predictor loader for a prepared artifact. After the call, phases holds the
+    seconds spent in each load step (manifest, tokenizer, weights, quantize)
+    """
+
+    def __init__(self, artifact_dir, device=None):
+        self.artifact_dir = Path(artifact_dir)
+        self.device = device or get_device()
+        self.phases = {}
+
+    def __call__(self):
+        self.phases = {}
+        with timed(self.phases, "manifest"):
+            manifest = read_manifest(self.artifact_dir)
+        if manifest["device"] != self.device:
+            raise ArtifactError(f"{self.artifact_dir} was prepared for {manifest['device']}, not {self.device}")
+
+        with timed(self.phases, "tokenizer"):
+            tokenizer = AutoTokenizer.from_pretrained(self.artifact_dir)
+            tokenizer.pad_token = tokenizer.eos_token
+
+        # safetensors are memory-mapped and copied straight to their device;
+        # a saved quantization_config means bitsandbytes loads the stored
+        # int8/nf4 tensors instead of quantizing again
+        with timed(self.phases, "weights"):
+            model = AutoModelForCausalLM.from_pretrained(
+                self.artifact_dir,
+                use_safetensors=True,
+                low_cpu_mem_usage=True,
+                device_map="auto" if self.device == "cuda" else None,
+                torch_dtype=torch.float32 if self.device == "cpu" else "auto",
+            )
+
+        if self.device == "cpu":
+            with timed(self.phases, "quantize"):
+                model = quantize_for_cpu(model.eval())
+
+        model.generation_config.pad_token_id = tokenizer.eos_token_id
+        return model, tokenizer
+
+
+if __name__ == "__main__":
+    from inference import Predictor
+
+    parser = argparse.ArgumentParser(description="Prepare or load a cold-start model artifact")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prepare = commands.add_parser("prepare", help="Write an artifact")
+    prepare.add_argument("--output", required=True)
+    prepare.add_argument("--model", default=None, help="Model to package instead of the configured run")
+    prepare.add_argument("--device", choices=["cuda", "cpu"], default=None)
+
+    load = commands.add_parser("load", help="Time a Predictor built from an artifact")
+    load.add_argument("artifact")
+    load.add_argument("--device", choices=["cuda", "cpu"], default=None)
+    args = parser.parse_args()
+
+    if args.command == "prepare":
+        prepare_artifact(args.output, args.model, args.device)
+    else:
+        predictor = Predictor(loader=ArtifactLoader(args.artifact, args.device), device=args.device)
+        predictor.warmup()
+        stats = predictor.stats()
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in stats["load_phases"].items())
+        print(f"Loaded in {stats['load_time']:.2f}s ({phases}); warmup {stats['warmup_time']:.2f}s")
@@ -0,0 +1,135 @@
+# ===============================
+# Dynamic Micro-Batching
+# ===============================
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+from eval_config import CFG
+from pricer.latency import percentile
+
+_STOP = object()
+REQUEST_HISTORY = 1_000
+
+
+class BatcherClosed(RuntimeError):
+    pass
+
+
+class BatchingPredictor:
+    """
+    Collects prompts from concurrent callers into one queue and runs them through
+    Predictor.predict_batch, up to max_batch_size prompts or max_wait seconds
+    after the first one arrived, whichever comes first.
+    Each caller blocks only until its own result is ready; request times run
+    from submit to result, so they include the wait for a batch
+    """
+
+    def __init__(self, predictor, max_batch_size=None, max_wait=None):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size or CFG["serving"]["max_batch_size"]
+        self.max_wait = CFG["serving"]["max_wait_ms"] / 1000 if max_wait is None else max_wait
+
+        self.queue = queue.Queue()
+        self.batch_sizes = Counter()
+        self.queue_depths = Counter()
+        self.request_times = deque(maxlen=REQUEST_HISTORY)
+        self.requests = 0
+
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._loop, daemon=True)
+        self._worker.start()
+
+    def submit(self, prompt: str) -> Future:
+        """Queue a prompt without blocking; bulk callers submit many, then wait on each"""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise BatcherClosed("BatchingPredictor is closed")
+            self.queue.put((prompt, future, time.perf_counter()))
+        return future
+
+    def predict(self, prompt: str, timeout=None) -> str:
+        return self.submit(prompt).result(timeout)
+
+    def close(self):
+        """
+        Stop accepting prompts, finish the ones already queued, then stop the
+        worker. Anything still left in the queue fails instead of hanging
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self.queue.put(_STOP)
+        self._worker.join()
+
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                item[1].set_exception(BatcherClosed("BatchingPredictor closed before this prompt ran"))
+
+    def _next_batch(self):
+        """Block for the first request, then gather more until the batch is full or the wait expires"""
+        first = self.queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _loop(self):
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if not batch:
+                continue
+
+            self.batch_sizes[len(batch)] += 1
+            self.queue_depths[self.queue.qsize()] += 1
+
+            try:
+                outputs = self.predictor.predict_batch([prompt for prompt, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future, submitted), output in zip(batch, outputs):
+                future.set_result(output)
+                self.request_times.append(time.perf_counter() - submitted)
+            self.requests += len(batch)
+
+    def stats(self) -> dict:
+        batches = sum(self.batch_sizes.values())
+        prompts = sum(size * count for size, count in self.batch_sizes.items())
+        times = list(self.request_times)
+        return {
+            "batches": batches,
+            "mean_batch_size": prompts / batches if batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "queue_depth_histogram": dict(sorted(self.queue_depths.items())),
+            "requests": self.requests,
+            "request_time_mean": sum(times) / len(times) if times else 0.0,
+            "request_time_p50": percentile(times, 50),
+            "request_time_p95": percentile(times, 95),
+        }
@@ -0,0 +1,48 @@
+# ===============================
+# CPU Throughput Benchmark
+# ===============================
+# Generated tokens/sec on CPU for float32 and int8 dynamic-quantized weights,
+# to size CPU fleets. Point --model at a merged checkpoint for real numbers:
+#   python benchmark_cpu.py --model merged/2025-12-16_05.43.13 --threads 8
+import argparse
+import time
+
+import torch
+
+from benchmark_prefix_cache import BENCHMARK_MODEL, sample_prompts
+from local_service import load_local
+
+
+def tokens_per_second(model, tokenizer, prompts, tokens, batch_size):
+    generated = 0
+    start = time.perf_counter()
+    for i in range(0, len(prompts), batch_size):
+        inputs = tokenizer(prompts[i : i + batch_size], return_tensors="pt", padding=True)
+        with torch.inference_mode():
+            model.generate(**inputs, min_new_tokens=tokens, max_new_tokens=tokens, do_sample=False)
+        generated += inputs["input_ids"].shape[0] * tokens
+    return generated / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CPU generation throughput")
+    parser.add_argument("--model", default=BENCHMARK_MODEL)
+    parser.add_argument("--prompts", type=int, default=16)
+    parser.add_argument("--tokens", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads())
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    model, tokenizer = load_local(args.model)
+    tokenizer.padding_side = "left"
+    model.eval()
+    prompts = sample_prompts(args.prompts)
+
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    print(f"{args.threads} threads, batch size {args.batch_size}, {args.tokens} new tokens per prompt")
+    for name, candidate in [("float32", model), ("int8 dynamic", quantized)]:
+        tokens_per_second(candidate, tokenizer, prompts[:2], args.tokens, args.batch_size)
+        rate = tokens_per_second(candidate, tokenizer, prompts, args.tokens, args.batch_size)
+        print(f"{name:<13} {rate:,.1f} tokens/sec")
@@ -0,0 +1,81 @@
+# ===============================
+# Import-Time Benchmark
+# ===============================
+# Cold-start seconds to import each module in a fresh interpreter, and which
+# heavy libraries the import dragged in. Run after changes that touch imports:
+#   python benchmark_imports.py
+#   python benchmark_imports.py --modules inference batching --budget 0.5 --output imports.json
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+MODULES = [
+    "config",
+    "eval_config",
+    "prompts",
+    "inference",
+    "batching",
+    "rewrite_cache",
+    "prefix_cache",
+    "price_decoding",
+    "eval_model",
+    "packing",
+    "snapshot",
+    "evaluate",
+    "train",
+]
+HEAVY = ["torch", "transformers", "peft", "datasets", "trl", "wandb"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(module, repeats=1):
+    """Best of repeats fresh-interpreter imports; the OS file cache is warm after the first"""
+    runs = []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            cwd=HERE,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            return {"module": module, "error": result.stderr.strip().splitlines()[-1]}
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda run: run["seconds"])
+    return {"module": module, **best}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure per-module import time")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=None, help="Exit non-zero if any module takes longer (seconds)")
+    parser.add_argument("--output", default=None, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results = [time_import(module, args.repeats) for module in args.modules]
+
+    print(f"{'Module':<16}{'Seconds':>9}  Heavy imports")
+    for row in results:
+        if "error" in row:
+            print(f"{row['module']:<16}{'-':>9}  failed: {row['error']}")
+        else:
+            print(f"{row['module']:<16}{row['seconds']:>9.3f}  {', '.join(row['loaded']) or '-'}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    over = [row["module"] for row in results if args.budget is not None and row.get("seconds", 0) > args.budget]
+    if over:
+        sys.exit(f"Over the {args.budget}s import budget: {', '.join(over)}")
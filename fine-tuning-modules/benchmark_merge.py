@@ -0,0 +1,58 @@
+# ===============================
+# Merged vs Adapter Benchmark
+# ===============================
+# Per-token generate latency on CPU for a small model with a LoRA adapter
+# attached versus the same adapter merged into the weights (repo root on PYTHONPATH):
+#   python benchmark_merge.py --model HuggingFaceTB/SmolLM2-135M --tokens 32
+import argparse
+import time
+
+import torch
+from peft import LoraConfig, get_peft_model
+
+from benchmark_prefix_cache import BENCHMARK_MODEL, sample_prompts
+from local_service import load_local
+from pricer.latency import percentile
+
+
+def per_token_latency(model, tokenizer, prompts, tokens):
+    times = []
+    for prompt in prompts:
+        inputs = tokenizer(prompt, return_tensors="pt")
+        start = time.perf_counter()
+        with torch.inference_mode():
+            model.generate(**inputs, min_new_tokens=tokens, max_new_tokens=tokens, do_sample=False)
+        times.append((time.perf_counter() - start) / tokens)
+    return times
+
+
+def report(name, times):
+    print(f"{name:<8} mean={sum(times) / len(times) * 1000:.2f}ms/token p95={percentile(times, 95) * 1000:.2f}ms/token")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark LoRA adapter vs merged weights on CPU")
+    parser.add_argument("--model", default=BENCHMARK_MODEL)
+    parser.add_argument("--prompts", type=int, default=20)
+    parser.add_argument("--tokens", type=int, default=32)
+    parser.add_argument("--rank", type=int, default=64)
+    args = parser.parse_args()
+
+    model, tokenizer = load_local(args.model)
+    # Same adapter shape as training; random B weights so the merge is not a no-op
+    lora = LoraConfig(
+        r=args.rank,
+        lora_alpha=args.rank * 2,
+        target_modules=["q_proj", "v_proj", "k_proj", "o_proj"],
+        init_lora_weights=False,
+        task_type="CAUSAL_LM",
+    )
+    adapter_model = get_peft_model(model, lora).eval()
+    prompts = sample_prompts(args.prompts)
+
+    per_token_latency(adapter_model, tokenizer, prompts[:2], args.tokens)
+    report("adapter", per_token_latency(adapter_model, tokenizer, prompts, args.tokens))
+
+    merged_model = adapter_model.merge_and_unload().eval()
+    per_token_latency(merged_model, tokenizer, prompts[:2], args.tokens)
+    report("merged", per_token_latency(merged_model, tokenizer, prompts, args.tokens))
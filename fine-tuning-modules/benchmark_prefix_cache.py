@@ -0,0 +1,67 @@
+# ===============================
+# Prefix Cache Benchmark
+# ===============================
+# Time-to-first-token with and without the shared-prefix KV cache, on CPU
+# (repo root on PYTHONPATH):
+#   python benchmark_prefix_cache.py --model HuggingFaceTB/SmolLM2-135M --prompts 50
+import argparse
+import time
+
+import torch
+
+from local_service import load_local
+from prefix_cache import PROMPT_PREFIX, PrefixCache
+from pricer.latency import percentile
+
+BENCHMARK_MODEL = "HuggingFaceTB/SmolLM2-135M"
+
+
+def sample_prompts(count):
+    return [
+        f"{PROMPT_PREFIX}Title: Sample product {i}\nCategory: Electronics\nBrand: Acme\n"
+        f"Description: A compact device for everyday use, model {i}.\n"
+        f"Details: Lightweight, durable and easy to set up.\n\nPrice is $"
+        for i in range(count)
+    ]
+
+
+def time_to_first_token(model, tokenizer, prompts, prefix_cache=None):
+    times = []
+    for prompt in prompts:
+        inputs = tokenizer(prompt, return_tensors="pt")
+        start = time.perf_counter()
+        if prefix_cache:
+            inputs = prefix_cache.generate_inputs(inputs)
+        with torch.inference_mode():
+            model.generate(**inputs, max_new_tokens=1, do_sample=False)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(name, times):
+    print(
+        f"{name:<14} mean={sum(times) / len(times) * 1000:.1f}ms "
+        f"p50={percentile(times, 50) * 1000:.1f}ms p95={percentile(times, 95) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark shared-prefix KV cache reuse")
+    parser.add_argument("--model", default=BENCHMARK_MODEL)
+    parser.add_argument("--prompts", type=int, default=50)
+    args = parser.parse_args()
+
+    model, tokenizer = load_local(args.model)
+    model.eval()
+    prompts = sample_prompts(args.prompts)
+
+    # Warm up both paths before timing
+    cache = PrefixCache(model, tokenizer, device="cpu")
+    time_to_first_token(model, tokenizer, prompts[:2])
+    time_to_first_token(model, tokenizer, prompts[:2], cache)
+
+    prompt_tokens = len(tokenizer(prompts[0])["input_ids"])
+    print(f"Prompt tokens: {prompt_tokens}, cached prefix tokens: {cache.length}")
+    report("no cache", time_to_first_token(model, tokenizer, prompts))
+    report("prefix cache", time_to_first_token(model, tokenizer, prompts, cache))
+    print(f"Cache hit rate: {cache.stats()['prefix_cache_hit_rate']:.0%}")
@@ -1,22 +1,24 @@
 # ===============================
 # Config Loader
 # ===============================
-import os
-import yaml
+# config.yaml is read on first use; TRAIN_CONFIG or CFG.set_path() points elsewhere
 from datetime import datetime
-from dotenv import load_dotenv
 
-load_dotenv(override=True)
+from lazy_config import LazyConfig
 
-with open("config.yaml", "r") as f:
-    CFG = yaml.safe_load(f)
+CFG = LazyConfig("config.yaml", env_var="TRAIN_CONFIG")
 
 RUN_NAME = f"{datetime.now():%Y-%m-%d_%H.%M.%S}"
 
-PROJECT_RUN_NAME = f"{CFG['project']['project_name']}-{RUN_NAME}"
-HUB_MODEL_NAME = f"{CFG['project']['username']}/{PROJECT_RUN_NAME}"
 
-DATASET_NAME = f"{CFG['dataset']['user']}/{CFG['dataset']['name']}"
+def get_project_run_name():
+    return f"{CFG['project']['project_name']}-{RUN_NAME}"
+
+
+def get_hub_model_name():
+    return f"{CFG['project']['username']}/{get_project_run_name()}"
+
+
+def get_dataset_name():
+    return f"{CFG['dataset']['user']}/{CFG['dataset']['name']}"
 
-HF_TOKEN = os.getenv("HF_TOKEN")
-WANDB_API_KEY = os.getenv("WANDB_API_KEY")
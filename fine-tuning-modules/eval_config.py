@@ -1,17 +1,23 @@
 # ===============================
 # Eval Config Loader
 # ===============================
-import os
-import yaml
-from dotenv import load_dotenv
+# eval_config.yaml is read on first use; EVAL_CONFIG or CFG.set_path() points elsewhere
+from lazy_config import LazyConfig
 
-load_dotenv(override=True)
+CFG = LazyConfig("eval_config.yaml", env_var="EVAL_CONFIG")
 
-with open("eval_config.yaml", "r") as f:
-    CFG = yaml.safe_load(f)
 
-PROJECT_RUN_NAME = f"{CFG['project']['project_name']}-{CFG['run']['run_name']}"
-HUB_MODEL_NAME = f"{CFG['project']['hf_user']}/{PROJECT_RUN_NAME}"
-DATASET_NAME = f"{CFG['dataset']['user']}/{CFG['dataset']['name']}"
+def get_project_run_name():
+    return f"{CFG['project']['project_name']}-{CFG['run']['run_name']}"
 
-HF_TOKEN = os.getenv("HF_TOKEN")
+
+def get_hub_model_name():
+    return f"{CFG['project']['hf_user']}/{get_project_run_name()}"
+
+
+def get_dataset_name():
+    return f"{CFG['dataset']['user']}/{CFG['dataset']['name']}"
+
+
+def get_device():
+    return CFG["runtime"]["device"]
@@ -4,10 +4,12 @@
 import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
 from peft import PeftModel
-from eval_config import CFG, HUB_MODEL_NAME
+from eval_config import CFG, get_device, get_hub_model_name
 
 
 def get_precision():
+    if get_device() != "cuda":
+        return False
     capability = torch.cuda.get_device_capability()
     return capability[0] >= 8
 
@@ -28,7 +30,7 @@ def get_quant_config(use_bf16):
 
 def load_tokenizer():
     tokenizer = AutoTokenizer.from_pretrained(
-        CFG["project"]["base_model"],
+        CFG["run"]["merged_model"] or CFG["project"]["base_model"],
         trust_remote_code=True,
     )
     tokenizer.pad_token = tokenizer.eos_token
@@ -36,21 +38,73 @@ def load_tokenizer():
     return tokenizer
 
 
-def load_model():
-    use_bf16 = get_precision()
-    quant_config = get_quant_config(use_bf16)
-
-    base_model = AutoModelForCausalLM.from_pretrained(
-        CFG["project"]["base_model"],
+def load_merged_model(use_bf16, quant_config):
+    # Standalone checkpoint from merge_adapter.py: the adapter is already in the weights
+    model = AutoModelForCausalLM.from_pretrained(
+        CFG["run"]["merged_model"],
         quantization_config=quant_config,
         device_map="auto",
     )
+    model.generation_config.pad_token_id = model.config.eos_token_id
+    return model, use_bf16
+
+
+def quantize_for_cpu(model):
+    if CFG["runtime"]["cpu_quantization"] == "int8_dynamic":
+        # int8 weights, activations quantized on the fly per batch
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def load_cpu_model():
+    """
+    bitsandbytes quantization is CUDA-only, so CPU loads float32 weights with
+    the adapter merged in and optionally applies dynamic int8 quantization
+    """
+    if CFG["run"]["merged_model"]:
+        model = AutoModelForCausalLM.from_pretrained(CFG["run"]["merged_model"], torch_dtype=torch.float32)
+    else:
+        base_model = AutoModelForCausalLM.from_pretrained(CFG["project"]["base_model"], torch_dtype=torch.float32)
+        model = PeftModel.from_pretrained(
+            base_model,
+            get_hub_model_name(),
+            revision=CFG["run"]["revision"],
+        ).merge_and_unload()
+
+    model.generation_config.pad_token_id = model.config.eos_token_id
+    return quantize_for_cpu(model.eval()), False
+
+
+def load_base_model():
+    """Base model ready for adapters: quantized on CUDA, float32 on CPU"""
+    use_bf16 = get_precision()
+
+    if get_device() == "cpu":
+        base_model = AutoModelForCausalLM.from_pretrained(CFG["project"]["base_model"], torch_dtype=torch.float32)
+    else:
+        base_model = AutoModelForCausalLM.from_pretrained(
+            CFG["project"]["base_model"],
+            quantization_config=get_quant_config(use_bf16),
+            device_map="auto",
+        )
 
     base_model.generation_config.pad_token_id = base_model.config.eos_token_id
+    return base_model, use_bf16
+
+
+def load_model():
+    if get_device() == "cpu":
+        return load_cpu_model()
+
+    if CFG["run"]["merged_model"]:
+        use_bf16 = get_precision()
+        return load_merged_model(use_bf16, get_quant_config(use_bf16))
+
+    base_model, use_bf16 = load_base_model()
 
     model = PeftModel.from_pretrained(
         base_model,
-        HUB_MODEL_NAME,
+        get_hub_model_name(),
         revision=CFG["run"]["revision"],
     )
 
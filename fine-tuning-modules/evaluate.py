@@ -1,61 +1,115 @@
 # ===============================
 # Evaluation Script
 # ===============================
-import torch
-from datasets import load_dataset
+# Run from this directory with the repo root on PYTHONPATH:
+#   python evaluate.py                                  # single process
+#   python evaluate.py --num-shards 4 --shard 0         # one shard of the test split
+#   python evaluate.py --merge                          # combine the shard results
+#   python evaluate.py --batch-size 1                   # one prompt per generate call
+#   python evaluate.py --config other_eval_config.yaml
+# Importing this module has no side effects; main() does the work.
+import argparse
+import os
+
 from huggingface_hub import login
-from transformers import set_seed
 
-from eval_config import CFG, DATASET_NAME, HF_TOKEN
-from eval_model import load_model, load_tokenizer
-from util import evaluate
+from eval_config import CFG, get_dataset_name
+from inference import Predictor, load_fine_tuned, prompt_length
+from snapshot import load_dataset_or_snapshot
+from pricer.evaluate import DEFAULT_SIZE, evaluate, merge_shards, run_shard
 
 
 # ===============================
-# Auth
+# Arguments
 # ===============================
-login(HF_TOKEN, add_to_git_credential=True)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate the fine-tuned price model")
+    parser.add_argument("--num-shards", type=int, default=1)
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--size", type=int, default=None, help="Datapoints to evaluate (default: 200, or the whole split when sharded)")
+    parser.add_argument("--shard-dir", default="eval_shards")
+    parser.add_argument("--output-dir", default=None, help="Write metrics and charts here instead of showing them")
+    parser.add_argument("--batch-size", type=int, default=None, help="Prompts per generate call (default: generation.eval_batch_size)")
+    parser.add_argument("--merge", action="store_true", help="Merge shard results; no model is loaded")
+    parser.add_argument("--config", default=None, help="eval_config.yaml to use instead of the one next to this script")
+    return parser.parse_args(argv)
 
 
 # ===============================
-# Dataset
+# Prediction Functions
 # ===============================
-dataset = load_dataset(DATASET_NAME)
-test_dataset = dataset["test"]
+def make_predictors(predictor):
+    """
+    Dataset-row predictors over one Predictor, so offline evaluation decodes
+    exactly as serving and the sweep do (generation.decoding, prefix cache)
+    """
 
+    def model_predict(item):
+        return predictor.predict(item["prompt"])
 
-# ===============================
-# Model
-# ===============================
-tokenizer = load_tokenizer()
-model, _ = load_model()
+    def model_predict_batch(items):
+        return predictor.predict_batch([item["prompt"] for item in items])
 
-print(f"Memory footprint: {model.get_memory_footprint() / 1e6:.1f} MB")
+    return model_predict, model_predict_batch
 
 
 # ===============================
-# Prediction Function
+# Run Evaluation
 # ===============================
-def model_predict(item):
-    inputs = tokenizer(
-        item["prompt"],
-        return_tensors="pt",
-    ).to("cuda")
+def main(argv=None):
+    args = parse_args(argv)
+    if args.config:
+        CFG.set_path(args.config)
 
-    with torch.no_grad():
-        output_ids = model.generate(
-            **inputs,
-            max_new_tokens=CFG["generation"]["max_new_tokens"],
-        )
+    if args.merge:
+        merge_shards(args.shard_dir, output_dir=args.output_dir)
+        return
 
-    prompt_len = inputs["input_ids"].shape[1]
-    generated_ids = output_ids[0, prompt_len:]
+    # With a dataset snapshot and a cached model, HF_HUB_OFFLINE=1 runs without the network
+    if not os.getenv("HF_HUB_OFFLINE"):
+        login(CFG.env("HF_TOKEN"), add_to_git_credential=True)
 
-    return tokenizer.decode(generated_ids, skip_special_tokens=True)
+    dataset = load_dataset_or_snapshot(get_dataset_name(), CFG["dataset"]["snapshot"])
+    test_dataset = dataset["test"]
 
+    predictor = Predictor(loader=load_fine_tuned)
+    print(f"Memory footprint: {predictor.model.get_memory_footprint() / 1e6:.1f} MB")
+    model_predict, model_predict_batch = make_predictors(predictor)
 
-# ===============================
-# Run Evaluation
-# ===============================
-set_seed(CFG["generation"]["seed"])
-evaluate(model_predict, test_dataset)
+    # One model instance serves every prediction, so the tester runs a single worker.
+    # Batches are cut from length-sorted prompts to keep padding low
+    batch_size = args.batch_size or CFG["generation"]["eval_batch_size"]
+    if batch_size > 1:
+        predict = model_predict_batch
+        batching = dict(batch_size=batch_size, sort_key=prompt_length)
+    else:
+        predict = model_predict
+        batching = {}
+
+    if args.num_shards > 1:
+        path = run_shard(
+            predict,
+            test_dataset,
+            shard=args.shard,
+            num_shards=args.num_shards,
+            output_dir=args.shard_dir,
+            size=args.size,
+            workers=1,
+            columns=["prompt", "completion"],
+            **batching,
+        )
+        print(f"Wrote shard results to {path}")
+    else:
+        evaluate(
+            predict,
+            test_dataset,
+            size=args.size or DEFAULT_SIZE,
+            workers=1,
+            output_dir=args.output_dir,
+            columns=["prompt", "completion"],
+            **batching,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,177 @@
 # ===============================
 # Inference Logic
 # ===============================
-import torch
-from transformers import set_seed
-from eval_model import load_model, load_tokenizer
-from eval_config import CFG
+# torch, transformers and peft are imported where they are first needed, so
+# importing this module (for extract_price, or while building the Modal image)
+# doesn't pay for them; they load when a Predictor is built
+import re
+import time
+from collections import deque
+
+from eval_config import CFG, get_device
+from pricer.latency import percentile, phase
+from prompts import QUESTION
+
+FALLBACK_PRICE = 999.0
+
+WARMUP_PROMPT = f"{QUESTION}\n\nTitle: Warmup item\nCategory: Electronics\n\nPrice is $"
+REQUEST_HISTORY = 1_000
+
+# greedy: open-ended generation; constrained: digits and one '.' only, stopping
+# at the first complete price; expected: probability-weighted price from one forward pass
+DECODING_MODES = ("greedy", "constrained", "expected")
+
+
+def extract_price(text: str) -> float:
+    match = re.search(
+        r"[-+]?\d*\.\d+|\d+",
+        text.replace("$", "").replace(",", ""),
+    )
+    if match:
+        return float(match.group())
+    return FALLBACK_PRICE
+
+
+def prompt_length(item):
+    """Sort key that groups dataset rows of similar length into the same batch"""
+    return len(item["prompt"])
+
+
+def default_loader():
+    """The prepared artifact when run.artifact is set, otherwise base model + adapter from the Hub"""
+    if CFG["run"]["artifact"]:
+        from artifact import ArtifactLoader
+
+        return ArtifactLoader(CFG["run"]["artifact"])
+    return load_fine_tuned
+
+
+def load_fine_tuned():
+    from eval_model import load_model, load_tokenizer
+
+    tokenizer = load_tokenizer()
+    model, _ = load_model()
+    return model, tokenizer
 
 
 class Predictor:
-    def __init__(self):
-        self.tokenizer = load_tokenizer()
-        self.model, _ = load_model()
+    """
+    Holds the tokenizer and model for the lifetime of a process; build it once,
+    call warmup(), then reuse it for every request.
+    loader returns (model, tokenizer), e.g. a small CPU model for local runs;
+    the default is default_loader()
+    """
+
+    def __init__(self, loader=None, device=None, decoding=None, prefix_cache=None):
+        from transformers import set_seed
+
+        from prefix_cache import PrefixCache
+        from price_decoding import PriceVocab
+
+        loader = loader or default_loader()
+        start = time.perf_counter()
+        self.model, self.tokenizer = loader()
+        # Loaders that time their own steps (e.g. ArtifactLoader) expose them as phases
+        self.load_phases = dict(getattr(loader, "phases", {}))
         self.model.eval()
+        # Batched causal generation needs every prompt to end at the same position
+        self.tokenizer.padding_side = "left"
+        self.device = device or get_device()
         set_seed(CFG["generation"]["seed"])
 
-    def predict(self, prompt: str) -> str:
-        inputs = self.tokenizer(
-            prompt,
-            return_tensors="pt",
-        ).to("cuda")
+        self.decoding = decoding or CFG["generation"]["decoding"]
+        if self.decoding not in DECODING_MODES:
+            raise ValueError(f"Unknown decoding mode {self.decoding!r}, expected one of {DECODING_MODES}")
+        self.price_vocab = PriceVocab(self.tokenizer) if self.decoding != "greedy" else None
 
-        with torch.inference_mode():
+        use_prefix_cache = CFG["generation"]["prefix_cache"] if prefix_cache is None else prefix_cache
+        self.prefix_cache = PrefixCache(self.model, self.tokenizer, device=self.device) if use_prefix_cache else None
+
+        self.load_time = time.perf_counter() - start
+        self.warmup_time = None
+        # One entry per predict_batch call: a batch's time is shared by all its
+        # prompts, so per-request latency is measured by the caller (BatchingPredictor)
+        self.batch_times = deque(maxlen=REQUEST_HISTORY)
+        self.batch_prompts = deque(maxlen=REQUEST_HISTORY)
+        self.requests = 0
+
+    def warmup(self):
+        """Run one dummy generate so the first real request doesn't pay for lazy init"""
+        start = time.perf_counter()
+        self._generate([WARMUP_PROMPT])
+        self.warmup_time = time.perf_counter() - start
+
+    def _generate(self, prompts: list[str]) -> list[str]:
+        import torch
+        from transformers import LogitsProcessorList, StoppingCriteriaList
+
+        from price_decoding import PriceLogitsProcessor, PriceStoppingCriteria, expected_prices, with_prefix
+
+        if self.decoding != "greedy":
+            prompts = [with_prefix(prompt) for prompt in prompts]
+
+        with phase("tokenize"):
+            inputs = self.tokenizer(
+                prompts,
+                return_tensors="pt",
+                padding=True,
+            ).to(self.device)
+
+        if self.decoding == "expected":
+            if self.prefix_cache:
+                inputs = self.prefix_cache.forward_inputs(inputs)
+            with phase("forward"):
+                prices = expected_prices(self.model, inputs, self.price_vocab)
+            return [f"{price:.2f}" for price in prices]
+
+        prompt_len = inputs["input_ids"].shape[1]
+        constraints = {}
+        if self.decoding == "constrained":
+            constraints = dict(
+                logits_processor=LogitsProcessorList([PriceLogitsProcessor(self.price_vocab, prompt_len)]),
+                stopping_criteria=StoppingCriteriaList([PriceStoppingCriteria(self.tokenizer, prompt_len)]),
+            )
+
+        if self.prefix_cache:
+            inputs = self.prefix_cache.generate_inputs(inputs)
+
+        with phase("generate"), torch.inference_mode():
             output_ids = self.model.generate(
                 **inputs,
                 max_new_tokens=CFG["generation"]["max_new_tokens"],
+                **constraints,
             )
 
-        prompt_len = inputs["input_ids"].shape[1]
-        generated_ids = output_ids[0, prompt_len:]
+        with phase("decode"):
+            return self.tokenizer.batch_decode(
+                output_ids[:, prompt_len:],
+                skip_special_tokens=True,
+            )
+
+    def predict_batch(self, prompts: list[str]) -> list[str]:
+        start = time.perf_counter()
+        outputs = self._generate(prompts)
+        self.batch_times.append(time.perf_counter() - start)
+        self.batch_prompts.append(len(prompts))
+        self.requests += len(prompts)
+        return outputs
+
+    def predict(self, prompt: str) -> str:
+        return self.predict_batch([prompt])[0]
 
-        return self.tokenizer.decode(
-            generated_ids,
-            skip_special_tokens=True,
-        )
+    def stats(self) -> dict:
+        times = list(self.batch_times)
+        prompts = sum(self.batch_prompts)
+        prefix_stats = self.prefix_cache.stats() if self.prefix_cache else {}
+        return {
+            **prefix_stats,
+            "load_time": self.load_time,
+            "load_phases": self.load_phases,
+            "warmup_time": self.warmup_time,
+            "prompts": self.requests,
+            "batch_time_mean": sum(times) / len(times) if times else 0.0,
+            "batch_time_p50": percentile(times, 50),
+            "batch_time_p95": percentile(times, 95),
+            "batch_prompts_mean": prompts / len(times) if times else 0.0,
+            "prompts_per_sec": prompts / sum(times) if times else 0.0,
+        }
@@ -0,0 +1,204 @@
+# ===============================
+# Bulk Prediction Jobs
+# ===============================
+# Job lifecycle for POST /predict/jobs: items are stored under a job id, split
+# into batches, fanned out to predict_batch workers and collected as they
+# finish. The store is any mapping: a modal.Dict on Modal, a locked dict here.
+# Local stand-in, without Modal (--fake skips the model entirely):
+#   python jobs.py --items 500 --batch-size 32 --workers 4 --fake
+#   python jobs.py --items 200 --model sshleifer/tiny-gpt2
+import argparse
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+BATCH_SIZE = 32
+MAX_ITEMS = 10_000
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def split_batches(items, batch_size=BATCH_SIZE):
+    return [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+
+
+def _items_key(job_id):
+    return f"{job_id}:items"
+
+
+def _batch_key(job_id, index):
+    return f"{job_id}:batch:{index}"
+
+
+# ===============================
+# Store Operations
+# ===============================
+def create_job(store, items, batch_size=BATCH_SIZE) -> str:
+    job_id = uuid.uuid4().hex
+    store[_items_key(job_id)] = items
+    store[job_id] = {
+        "job_id": job_id,
+        "status": QUEUED,
+        "total": len(items),
+        "batch_size": batch_size,
+        "batches": len(split_batches(items, batch_size)),
+        "completed": 0,
+        "errors": 0,
+        "created": time.time(),
+        "started": None,
+        "finished": None,
+        "error": None,
+    }
+    return job_id
+
+
+def run_job(store, job_id, map_batches):
+    """
+    Coordinates one job. map_batches(batches) yields (index, results) in
+    completion order, one results list per batch, each result a dict with
+    "price" or "error". This is the only writer of the job record, so progress
+    updates never race across workers
+    """
+    job = store[job_id]
+    batches = split_batches(store[_items_key(job_id)], job["batch_size"])
+    job.update(status=RUNNING, started=time.time())
+    store[job_id] = job
+
+    try:
+        for index, results in map_batches(batches):
+            store[_batch_key(job_id, index)] = results
+            job["completed"] += len(results)
+            job["errors"] += sum("error" in result for result in results)
+            store[job_id] = job
+    except Exception as e:
+        job.update(status=FAILED, error=f"{type(e).__name__}: {e}", finished=time.time())
+        store[job_id] = job
+        raise
+
+    job.update(status=DONE, finished=time.time())
+    store[job_id] = job
+    return job
+
+
+def job_status(store, job_id):
+    """The job record plus throughput and a naive ETA; None for unknown ids"""
+    job = store.get(job_id)
+    if job is None:
+        return None
+    elapsed = (job["finished"] or time.time()) - job["started"] if job["started"] else 0.0
+    rate = job["completed"] / elapsed if elapsed else 0.0
+    remaining = job["total"] - job["completed"]
+    return {
+        **job,
+        "progress": job["completed"] / job["total"] if job["total"] else 1.0,
+        "elapsed": elapsed,
+        "items_per_sec": rate,
+        "eta": remaining / rate if rate and job["status"] == RUNNING else None,
+    }
+
+
+def job_results(store, job_id, offset=0, limit=None):
+    """Results in submission order for the finished prefix of batches; None for unknown ids"""
+    job = store.get(job_id)
+    if job is None:
+        return None
+    results = []
+    for index in range(job["batches"]):
+        batch = store.get(_batch_key(job_id, index))
+        if batch is None:
+            break
+        results.extend(batch)
+    end = None if limit is None else offset + limit
+    return {"job_id": job_id, "status": job["status"], "offset": offset, "results": results[offset:end]}
+
+
+# ===============================
+# Local Stand-In
+# ===============================
+class LockedDict(dict):
+    """Enough of modal.Dict for the job functions, safe across threads"""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+
+    def __getitem__(self, key):
+        with self._lock:
+            return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return super().get(key, default)
+
+
+class LocalJobRunner:
+    """
+    The same lifecycle in one process: predict_batch(items) -> results stands
+    in for ModelService.predict_batch and workers for containers
+    """
+
+    def __init__(self, predict_batch, workers=4, batch_size=BATCH_SIZE):
+        self.store = LockedDict()
+        self.predict_batch = predict_batch
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def _map_batches(self, batches):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.predict_batch, batch): index for index, batch in enumerate(batches)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def submit(self, items) -> str:
+        job_id = create_job(self.store, items, self.batch_size)
+        threading.Thread(target=run_job, args=(self.store, job_id, self._map_batches), daemon=True).start()
+        return job_id
+
+    def status(self, job_id):
+        return job_status(self.store, job_id)
+
+    def results(self, job_id, offset=0, limit=None):
+        return job_results(self.store, job_id, offset, limit)
+
+
+def fake_predict_batch(items, seconds_per_batch=0.05):
+    time.sleep(seconds_per_batch)
+    return [{"price": round(random.uniform(5, 500), 2)} for _ in items]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a bulk prediction job locally")
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--fake", action="store_true", help="Sleep instead of running a model")
+    parser.add_argument("--model", default=None, help="Small CPU model for local_service.py")
+    args = parser.parse_args()
+
+    if args.fake:
+        predict_batch = fake_predict_batch
+    else:
+        from local_service import LOCAL_MODEL, LocalModelService
+
+        service = LocalModelService(args.model or LOCAL_MODEL, batching=True)
+        predict_batch = service.predict_batch
+
+    runner = LocalJobRunner(predict_batch, workers=args.workers, batch_size=args.batch_size)
+    items = [{"content": f"Title: Sample product {i}\nCategory: Electronics\nBrand: Acme"} for i in range(args.items)]
+
+    job_id = runner.submit(items)
+    while (status := runner.status(job_id))["status"] in (QUEUED, RUNNING):
+        print(f"{status['completed']}/{status['total']} items, {status['items_per_sec']:.1f}/s")
+        time.sleep(0.5)
+
+    results = runner.results(job_id)["results"]
+    print(
+        f"Job {status['status']}: {len(results)} results, {status['errors']} errors "
+        f"in {status['elapsed']:.2f}s ({status['items_per_sec']:.1f} items/sec)"
+    )
@@ -0,0 +1,64 @@
+# ===============================
+# Lazy YAML Config
+# ===============================
+import os
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+
+import yaml
+from dotenv import load_dotenv
+
+HERE = Path(__file__).resolve().parent
+
+
+class LazyConfig(Mapping):
+    """
+    A YAML file read on first access instead of at import. The path is, in
+    order: set_path(), the env_var environment variable, then filename next to
+    this module, so scripts no longer depend on the working directory.
+    .env is loaded at the same moment
+    """
+
+    def __init__(self, filename, env_var):
+        self.filename = filename
+        self.env_var = env_var
+        self._path = None
+        self._data = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return Path(self._path or os.getenv(self.env_var) or HERE / self.filename)
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    def set_path(self, path):
+        if self.loaded:
+            raise RuntimeError(f"{self.filename} was already loaded from {self.path}; set the path before first use")
+        self._path = path
+
+    def _config(self):
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    load_dotenv(override=True)
+                    with open(self.path, "r") as f:
+                        self._data = yaml.safe_load(f)
+        return self._data
+
+    def env(self, name):
+        """An environment variable, after .env has been loaded alongside the config"""
+        self._config()
+        return os.getenv(name)
+
+    def __getitem__(self, key):
+        return self._config()[key]
+
+    def __iter__(self):
+        return iter(self._config())
+
+    def __len__(self):
+        return len(self._config())
@@ -0,0 +1,96 @@
+# ===============================
+# Local Model Service
+# ===============================
+# The ModelService lifecycle without Modal or a GPU: a small causal LM on CPU is
+# loaded once, warmed up, and reused for every request. Run from this directory
+# with the repo root on PYTHONPATH:
+#   python local_service.py --model sshleifer/tiny-gpt2 --requests 20
+#   python local_service.py --requests 200 --concurrency 32   # micro-batched
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from batching import BatchingPredictor
+from inference import DECODING_MODES, QUESTION, Predictor, extract_price
+
+LOCAL_MODEL = "sshleifer/tiny-gpt2"
+
+
+def load_local(model_name=LOCAL_MODEL):
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.pad_token = tokenizer.eos_token
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32)
+    model.generation_config.pad_token_id = tokenizer.eos_token_id
+    return model, tokenizer
+
+
+class LocalModelService:
+    """Stand-in for modal_app.ModelService; content is used as the description as-is"""
+
+    def __init__(self, model_name=LOCAL_MODEL, batching=False, decoding=None):
+        self.predictor = Predictor(loader=lambda: load_local(model_name), device="cpu", decoding=decoding)
+        self.predictor.warmup()
+        self.batcher = BatchingPredictor(self.predictor) if batching else None
+
+    def predict(self, content: str) -> float:
+        prompt = f"{QUESTION}\n\n{content}"
+        raw_output = self.batcher.predict(prompt) if self.batcher else self.predictor.predict(prompt)
+        price = extract_price(raw_output)
+        return price if price > 0 else 999.0
+
+    def predict_batch(self, items: list[dict]) -> list[dict]:
+        """Stand-in for ModelService.predict_batch, as used by jobs.LocalJobRunner"""
+        prompts = [f"{QUESTION}\n\n{item['content']}" for item in items]
+        if self.batcher:
+            futures = [self.batcher.submit(prompt) for prompt in prompts]
+            outputs = [future.result() for future in futures]
+        else:
+            outputs = self.predictor.predict_batch(prompts)
+        prices = [extract_price(output) for output in outputs]
+        return [{"price": price if price > 0 else 999.0} for price in prices]
+
+    def stats(self) -> dict:
+        stats = self.predictor.stats()
+        if self.batcher:
+            stats.update(self.batcher.stats())
+        return stats
+
+    def close(self):
+        if self.batcher:
+            self.batcher.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the price model service locally on CPU")
+    parser.add_argument("--model", default=LOCAL_MODEL)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent callers; >1 enables micro-batching")
+    parser.add_argument("--decoding", choices=DECODING_MODES, default=None)
+    args = parser.parse_args()
+
+    service = LocalModelService(args.model, batching=args.concurrency > 1, decoding=args.decoding)
+    contents = [f"Title: Sample product {i}\nCategory: Electronics\nBrand: Acme" for i in range(args.requests)]
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(service.predict, contents))
+    service.close()
+
+    stats = service.stats()
+    print(f"Load time:    {stats['load_time']:.2f}s")
+    print(f"Warmup time:  {stats['warmup_time']:.3f}s")
+    print(
+        f"Per batch:    mean={stats['batch_time_mean'] * 1000:.1f}ms "
+        f"p50={stats['batch_time_p50'] * 1000:.1f}ms "
+        f"p95={stats['batch_time_p95'] * 1000:.1f}ms, {stats['batch_prompts_mean']:.1f} prompts per batch, "
+        f"{stats['prompts_per_sec']:.1f} prompts/sec"
+    )
+    if service.batcher:
+        print(
+            f"Per request:  mean={stats['request_time_mean'] * 1000:.1f}ms "
+            f"p50={stats['request_time_p50'] * 1000:.1f}ms "
+            f"p95={stats['request_time_p95'] * 1000:.1f}ms over {stats['requests']} requests, including queueing"
+        )
+        print(f"Batches:      {stats['batches']} (mean size {stats['mean_batch_size']:.1f})")
+        print(f"Batch sizes:  {stats['batch_size_histogram']}")
+        print(f"Queue depths: {stats['queue_depth_histogram']}")
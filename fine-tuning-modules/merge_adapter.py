@@ -0,0 +1,54 @@
+# ===============================
+# Merge & Export LoRA Adapter
+# ===============================
+# Folds the LoRA adapter into the base weights and saves a standalone
+# safetensors checkpoint, so inference no longer pays for the adapter matmuls:
+#   python merge_adapter.py --output-dir merged/2025-12-16_05.43.13
+# Then point run.merged_model in eval_config.yaml at the output directory.
+import argparse
+import time
+
+import torch
+from peft import PeftModel
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from eval_config import CFG, get_hub_model_name
+
+DTYPES = {"bfloat16": torch.bfloat16, "float16": torch.float16, "float32": torch.float32}
+
+
+def merge_adapter(output_dir, adapter=None, revision=None, dtype="bfloat16"):
+    """
+    The base model is loaded unquantized: LoRA deltas can't be merged into
+    8-bit or 4-bit weights. Quantization is applied again when the merged
+    checkpoint is loaded for inference
+    """
+    start = time.perf_counter()
+    adapter = adapter or get_hub_model_name()
+    base_model = AutoModelForCausalLM.from_pretrained(
+        CFG["project"]["base_model"],
+        torch_dtype=DTYPES[dtype],
+        low_cpu_mem_usage=True,
+    )
+    model = PeftModel.from_pretrained(base_model, adapter, revision=revision)
+    model = model.merge_and_unload()
+
+    model.save_pretrained(output_dir, safe_serialization=True)
+    AutoTokenizer.from_pretrained(CFG["project"]["base_model"]).save_pretrained(output_dir)
+
+    print(f"Merged {adapter}@{revision or 'main'} into {output_dir} in {time.perf_counter() - start:.1f}s")
+    return output_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge a LoRA adapter into its base model")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--adapter", default=None, help="Hub adapter (default: the run in eval_config.yaml)")
+    parser.add_argument("--revision", default=None, help="Adapter revision (default: run.revision)")
+    parser.add_argument("--dtype", choices=DTYPES, default="bfloat16")
+    parser.add_argument("--config", default=None, help="eval_config.yaml to use instead of the one next to this script")
+    args = parser.parse_args()
+
+    if args.config:
+        CFG.set_path(args.config)
+    merge_adapter(args.output_dir, args.adapter, args.revision or CFG["run"]["revision"], args.dtype)
@@ -1,7 +1,10 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Literal, Optional, Union
+
 import modal
-import re
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
 
 app = modal.App("llama-price-predictor-2", include_source=True)
 
@@ -26,19 +29,47 @@ image = (
         "fastapi",
         "pydantic>=2.0.0",
         "pyyaml",
+        "scikit-learn",
     )
     .add_local_python_source("inference")
+    .add_local_python_source("prompts")
+    .add_local_python_source("lazy_config")
+    .add_local_python_source("price_decoding")
+    .add_local_python_source("prefix_cache")
+    .add_local_python_source("rewrite_cache")
+    .add_local_python_source("batching")
     .add_local_python_source("eval_model")
+    .add_local_python_source("artifact")
+    .add_local_python_source("merge_adapter")
+    .add_local_python_source("pricer")
     .add_local_python_source("evaluate")
     .add_local_python_source("train")
+    .add_local_python_source("packing")
+    .add_local_python_source("throughput")
+    .add_local_python_source("snapshot")
     .add_local_python_source("config")
     .add_local_python_source("eval_config")
     .add_local_file(local_path="config.yaml", remote_path="/root/config.yaml")
     .add_local_file(local_path="eval_config.yaml", remote_path="/root/eval_config.yaml")
 )
 
+# Bulk job coordinator and web endpoints need no model libraries
+web_image = (
+    modal.Image.debian_slim(python_version="3.10")
+    .pip_install("fastapi", "pydantic>=2.0.0")
+    .add_local_python_source("jobs")
+)
+
 volume = modal.Volume.from_name("hf-cache", create_if_missing=True)
 
+# Job records, items and per-batch results for /predict/jobs
+jobs_store = modal.Dict.from_name("price-prediction-jobs", create_if_missing=True)
+
+REWRITE_MODEL = "openai/gpt-4o"
+REWRITE_CACHE_DIR = "/root/.cache/huggingface/rewrite-cache"
+ARTIFACT_ROOT = "/root/.cache/huggingface/artifacts"
+REWRITE_CONCURRENCY = 16
+
 SYSTEM_PROMPT = """Create a concise description of a product. Respond only in this format. Do not include part numbers.
 Title: Rewritten short precise title
 Category: eg Electronics
@@ -46,20 +77,31 @@ Brand: Brand name
 Description: 1 sentence description
 Details: 1 sentence on features"""
 
+class ProductFields(BaseModel):
+    title: str
+    category: Optional[str] = None
+    brand: Optional[str] = None
+    description: Optional[str] = None
+    features: Optional[Union[list[str], str]] = None
+    details: Optional[dict] = None
+
 class PredictRequest(BaseModel):
-    content: str
+    content: str = ""
+    # llm: GPT-4o rewrites content; template: product fields are formatted locally
+    mode: Literal["llm", "template"] = "llm"
+    product: Optional[ProductFields] = None
 
 class PredictResponse(BaseModel):
     price: float
+    mode: str
+    timings: dict[str, float]
+    # Set when serving.cascade_model is configured: "cheap" or "llm"
+    source: Optional[str] = None
+    uncertainty: Optional[float] = None
 
-def extract_price(text: str) -> float:
-    match = re.search(
-        r"[-+]?\d*\.\d+|\d+",
-        text.replace("$", "").replace(",", ""),
-    )
-    if match:
-        return float(match.group())
-    return 999.0
+class JobRequest(BaseModel):
+    items: list[PredictRequest]
+    batch_size: int = Field(default=32, ge=1, le=256)
 
 @app.cls(
     gpu="A10G",
@@ -68,15 +110,82 @@ def extract_price(text: str) -> float:
     secrets=[secrets],
     timeout=600,
 )
+@modal.concurrent(max_inputs=32)
 class ModelService:
 
+    @modal.enter()
+    def load(self):
+        # Runs once per container: the model is loaded and warmed up before the
+        # first request and then reused by every predict call
+        from inference import Predictor
+        from batching import BatchingPredictor
+        from rewrite_cache import RewriteCache
+        from artifact import ArtifactLoader, default_artifact_dir
+        from eval_config import CFG
+
+        # A prepared artifact on the volume skips the adapter download and requantization
+        artifact_dir = default_artifact_dir(ARTIFACT_ROOT)
+        loader = ArtifactLoader(artifact_dir) if artifact_dir.exists() else None
+
+        self.predictor = Predictor(loader=loader)
+        self.predictor.warmup()
+        phases = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.predictor.load_phases.items())
+        print(
+            f"Model loaded in {self.predictor.load_time:.1f}s{f' ({phases})' if phases else ''}, "
+            f"warmup generate took {self.predictor.warmup_time:.2f}s"
+        )
+
+        # Concurrent inputs share the GPU through batched generate calls
+        self.batcher = BatchingPredictor(self.predictor)
+
+        # Repeated product texts skip the GPT-4o hop; rewrites persist on the volume,
+        # committed in the background and reloaded when a key isn't on disk yet
+        self.rewrite_cache = RewriteCache(REWRITE_CACHE_DIR, commit=volume.commit, reload=volume.reload)
+
+        # Items the cheap baseline is confident about never reach the GPU
+        self.cascade = None
+        serving = CFG["serving"]
+        if serving["cascade_model"]:
+            from pricer.cascade import BaselinePricer, CascadePredictor
+
+            self.cascade = CascadePredictor(
+                BaselinePricer.load(serving["cascade_model"]),
+                self.generate_prices,
+                serving["cascade_threshold"],
+            )
+
+    @modal.exit()
+    def shutdown(self):
+        self.batcher.close()
+        self.rewrite_cache.close()
+
     @modal.method()
-    def predict(self, content: str) -> float:
-        import torch
+    def stats(self) -> dict:
+        return {
+            **self.predictor.stats(),
+            **self.batcher.stats(),
+            **self.rewrite_cache.stats(),
+            **(self.cascade.stats() if self.cascade else {}),
+        }
+
+    def generate_prices(self, descriptions: list[str]) -> list[float]:
+        """Fine-tuned model prices for rewritten descriptions, all queued on the shared batcher at once"""
+        from inference import extract_price
+        from prompts import PROMPT_PREFIX
+
+        generations = [self.batcher.submit(f"{PROMPT_PREFIX}{description}") for description in descriptions]
+        prices = [extract_price(generation.result()) for generation in generations]
+        return [price if price > 0 else 999.0 for price in prices]
+
+    def rewrite(self, content: str) -> str:
         from litellm import completion
-        from inference import Predictor
+        from rewrite_cache import cache_key
 
-        predictor = Predictor()
+        key = cache_key(content, SYSTEM_PROMPT, REWRITE_MODEL)
+        cached = self.rewrite_cache.get(key)
+        if cached is not None:
+            print("REWRITE CACHE HIT")
+            return cached
 
         messages = [
             {"role": "system", "content": SYSTEM_PROMPT},
@@ -84,22 +193,55 @@ class ModelService:
         ]
 
         rewrite = completion(
-            model="openai/gpt-4o",
+            model=REWRITE_MODEL,
             messages=messages,
             temperature=0.0,
             max_tokens=256,
         )
 
         rewritten_description = rewrite.choices[0].message.content.strip()
+        self.rewrite_cache.put(key, rewritten_description)
+        return rewritten_description
 
-        print(f"GPT-4o FULL RESPONSE:\n{rewritten_description}")
+    @modal.method()
+    def predict(self, content: str, mode: str = "llm", product: Optional[dict] = None) -> dict:
+        from inference import extract_price
+        from pricer.template import build_summary
+
+        start = time.perf_counter()
+        if mode == "template":
+            rewritten_description = build_summary(**product)
+        else:
+            rewritten_description = self.rewrite(content)
+        rewrite_time = time.perf_counter() - start
+
+        print(f"REWRITE ({mode}) FULL RESPONSE:\n{rewritten_description}")
+
+        if self.cascade:
+            cascade_start = time.perf_counter()
+            prices, escalated, uncertainty = self.cascade.predict_batch([rewritten_description])
+            source = "llm" if escalated[0] else "cheap"
+            print(f"CASCADE: {source} (uncertainty {uncertainty[0]:.3f}), PRICE {prices[0]}")
+            return {
+                "price": prices[0],
+                "mode": mode,
+                "source": source,
+                "uncertainty": uncertainty[0],
+                "timings": {
+                    "rewrite": rewrite_time,
+                    "cascade": time.perf_counter() - cascade_start,
+                    "total": time.perf_counter() - start,
+                },
+            }
 
         # Directly prepend the price question to the full GPT response
         final_prompt = f"What is the price of the product, rounded to the nearest dollar?\n\n{rewritten_description}"
 
         print(f"FINAL PROMPT SENT TO LOCAL MODEL:\n{final_prompt}")
 
-        raw_output = predictor.predict(final_prompt)
+        generate_start = time.perf_counter()
+        raw_output = self.batcher.predict(final_prompt)
+        generate_time = time.perf_counter() - generate_start
 
         print(f"LOCAL MODEL RAW OUTPUT: '{raw_output}'")
 
@@ -112,17 +254,161 @@ class ModelService:
         final_price = price if price > 0 else 999.0
         print(f"FINAL PRICE RETURNED: {final_price}")
 
-        return final_price
+        return {
+            "price": final_price,
+            "mode": mode,
+            "timings": {
+                "rewrite": rewrite_time,
+                "generate": generate_time,
+                "total": time.perf_counter() - start,
+            },
+        }
+
+    @modal.method()
+    def predict_batch(self, index: int, items: list[dict]) -> tuple[int, list[dict]]:
+        """
+        One batch of a bulk job. Rewrites run concurrently and each prompt joins
+        the shared generate queue as soon as its rewrite lands; a failed item
+        gets an error entry instead of failing the batch
+        """
+        from inference import extract_price
+        from pricer.template import build_summary
+        from prompts import PROMPT_PREFIX
+
+        def describe(item):
+            if item["mode"] == "template":
+                return build_summary(**item["product"])
+            return self.rewrite(item["content"])
+
+        results = [None] * len(items)
+
+        if self.cascade:
+            descriptions = {}
+            with ThreadPoolExecutor(max_workers=REWRITE_CONCURRENCY) as pool:
+                rewrites = {pool.submit(describe, item): i for i, item in enumerate(items)}
+                for rewrite in as_completed(rewrites):
+                    i = rewrites[rewrite]
+                    try:
+                        descriptions[i] = rewrite.result()
+                    except Exception as e:
+                        results[i] = {"error": f"rewrite failed: {e}"}
+
+            # One cheap pass over the batch; only the uncertain items are generated
+            order = list(descriptions)
+            try:
+                prices, escalated, uncertainty = self.cascade.predict_batch([descriptions[i] for i in order])
+            except Exception as e:
+                for i in order:
+                    results[i] = {"error": f"generate failed: {e}"}
+                return index, results
+            for i, price, escalate, u in zip(order, prices, escalated, uncertainty):
+                results[i] = {"price": price, "source": "llm" if escalate else "cheap", "uncertainty": u}
+            return index, results
+
+        generations = {}
+        with ThreadPoolExecutor(max_workers=REWRITE_CONCURRENCY) as pool:
+            rewrites = {pool.submit(describe, item): i for i, item in enumerate(items)}
+            for rewrite in as_completed(rewrites):
+                i = rewrites[rewrite]
+                try:
+                    generations[i] = self.batcher.submit(f"{PROMPT_PREFIX}{rewrite.result()}")
+                except Exception as e:
+                    results[i] = {"error": f"rewrite failed: {e}"}
+
+        for i, generation in generations.items():
+            try:
+                price = extract_price(generation.result())
+                results[i] = {"price": price if price > 0 else 999.0}
+            except Exception as e:
+                results[i] = {"error": f"generate failed: {e}"}
+
+        return index, results
+
+@app.function(
+    gpu="A10G",
+    image=image,
+    volumes={"/root/.cache/huggingface": volume},
+    secrets=[secrets],
+    timeout=3600,
+)
+def prepare_artifact():
+    """One-off: modal run modal_app.py::prepare_artifact, then new containers load the artifact"""
+    from artifact import default_artifact_dir, prepare_artifact as prepare
+
+    manifest = prepare(default_artifact_dir(ARTIFACT_ROOT))
+    volume.commit()
+    return manifest
+
+@app.function(image=web_image, timeout=24 * 60 * 60)
+def run_prediction_job(job_id: str):
+    """Fans a job's batches out across ModelService containers and records results as they land"""
+    from jobs import run_job
+
+    service = ModelService()
+
+    def map_batches(batches):
+        yield from service.predict_batch.map(range(len(batches)), batches, order_outputs=False)
+
+    run_job(jobs_store, job_id, map_batches)
 
 web_app = FastAPI()
 
+def validate(request: PredictRequest, label: str = "request"):
+    if request.mode == "template" and request.product is None:
+        raise HTTPException(status_code=422, detail=f"{label}: template mode needs structured product fields")
+    if request.mode == "llm" and not request.content:
+        raise HTTPException(status_code=422, detail=f"{label}: llm mode needs content to rewrite")
+
 @web_app.post("/predict", response_model=PredictResponse)
 async def predict(request: PredictRequest):
+    validate(request)
+
+    model = ModelService()
+    product = request.product.model_dump() if request.product else None
+    return await model.predict.remote.aio(request.content, request.mode, product)
+
+# Job endpoints are plain functions: FastAPI runs them in a thread pool, so the
+# blocking modal.Dict calls don't stall the event loop
+@web_app.post("/predict/jobs")
+def create_prediction_job(request: JobRequest):
+    from jobs import MAX_ITEMS, create_job
+
+    if not request.items:
+        raise HTTPException(status_code=422, detail="a job needs at least one item")
+    if len(request.items) > MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"at most {MAX_ITEMS} items per job")
+    for i, item in enumerate(request.items):
+        validate(item, f"items[{i}]")
+
+    items = [item.model_dump() for item in request.items]
+    job_id = create_job(jobs_store, items, request.batch_size)
+    run_prediction_job.spawn(job_id)
+    return {"job_id": job_id, "total": len(items), "batch_size": request.batch_size}
+
+@web_app.get("/predict/jobs/{job_id}")
+def prediction_job_status(job_id: str):
+    from jobs import job_status
+
+    status = job_status(jobs_store, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    return status
+
+@web_app.get("/predict/jobs/{job_id}/results")
+def prediction_job_results(job_id: str, offset: int = 0, limit: Optional[int] = None):
+    from jobs import job_results
+
+    results = job_results(jobs_store, job_id, offset, limit)
+    if results is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    return results
+
+@web_app.get("/stats")
+async def stats():
     model = ModelService()
-    price = await model.predict.remote.aio(request.content)
-    return {"price": price}
+    return await model.stats.remote.aio()
 
-@app.function()
+@app.function(image=web_image)
 @modal.asgi_app()
 def fastapi_app():
     return web_app
\ No newline at end of file
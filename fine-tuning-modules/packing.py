@@ -0,0 +1,183 @@
+# ===============================
+# Pre-tokenized, Packed Training Data
+# ===============================
+import hashlib
+import json
+from pathlib import Path
+
+import torch
+from datasets import Dataset, load_from_disk
+
+IGNORE_INDEX = -100
+CACHE_VERSION = 1
+
+
+# ===============================
+# Tokenization
+# ===============================
+def tokenize_example(example, tokenizer, max_length):
+    """Prompt + completion + EOS, with the loss only on the completion tokens"""
+    prompt_ids = tokenizer(example["prompt"])["input_ids"]
+    completion_ids = tokenizer(example["completion"], add_special_tokens=False)["input_ids"]
+    completion_ids = completion_ids + [tokenizer.eos_token_id]
+
+    input_ids = (prompt_ids + completion_ids)[:max_length]
+    labels = ([IGNORE_INDEX] * len(prompt_ids) + completion_ids)[:max_length]
+    return {"input_ids": input_ids, "labels": labels, "position_ids": list(range(len(input_ids)))}
+
+
+# ===============================
+# Packing
+# ===============================
+def pack(examples, max_length):
+    """
+    Best-fit-decreasing packing of tokenized examples into rows of at most
+    max_length tokens. Open rows are bucketed by remaining space, so each
+    placement scans at most max_length buckets. position_ids restart at 0 for
+    every example, which is how the collator recovers the boundaries between them
+    """
+    order = sorted(range(len(examples)), key=lambda i: len(examples[i]["input_ids"]), reverse=True)
+    rows = []
+    by_space = [[] for _ in range(max_length + 1)]
+
+    for i in order:
+        length = len(examples[i]["input_ids"])
+        space = next((s for s in range(length, max_length + 1) if by_space[s]), None)
+        if space is None:
+            rows.append([i])
+            r = len(rows) - 1
+            space = max_length
+        else:
+            r = by_space[space].pop()
+            rows[r].append(i)
+        by_space[space - length].append(r)
+
+    packed = {"input_ids": [], "labels": [], "position_ids": []}
+    for row in rows:
+        input_ids, labels, position_ids = [], [], []
+        for i in row:
+            input_ids += examples[i]["input_ids"]
+            labels += examples[i]["labels"]
+            position_ids += list(range(len(examples[i]["input_ids"])))
+        packed["input_ids"].append(input_ids)
+        packed["labels"].append(labels)
+        packed["position_ids"].append(position_ids)
+    return Dataset.from_dict(packed)
+
+
+def padding_fraction(lengths, batch_size):
+    """Share of padded positions when consecutive rows are padded to their batch maximum"""
+    real = sum(lengths)
+    padded = sum(
+        max(lengths[i : i + batch_size]) * len(lengths[i : i + batch_size])
+        for i in range(0, len(lengths), batch_size)
+    )
+    return 1 - real / padded if padded else 0.0
+
+
+# ===============================
+# Cache
+# ===============================
+def cache_key(dataset, tokenizer, max_length, packing):
+    payload = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "dataset": dataset._fingerprint,
+            "tokenizer": tokenizer.name_or_path,
+            "vocab_size": len(tokenizer),
+            "max_length": max_length,
+            "packing": packing,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def prepare_dataset(dataset, tokenizer, max_length, cache_dir, packing=True, batch_size=1):
+    """
+    Tokenize (and pack) once, caching the result as Arrow under cache_dir keyed
+    by the dataset fingerprint, tokenizer and config; later runs reload it
+    """
+    path = Path(cache_dir) / cache_key(dataset, tokenizer, max_length, packing)
+    if path.exists():
+        print(f"Loaded pre-tokenized dataset from {path}")
+        return load_from_disk(str(path))
+
+    tokenized = dataset.map(
+        tokenize_example,
+        fn_kwargs={"tokenizer": tokenizer, "max_length": max_length},
+        remove_columns=dataset.column_names,
+    )
+    lengths = [len(ids) for ids in tokenized["input_ids"]]
+
+    if packing:
+        result = pack(tokenized.to_list(), max_length)
+        packed_lengths = [len(ids) for ids in result["input_ids"]]
+        print(
+            f"Packed {len(tokenized):,} examples into {len(result):,} rows; padding fraction "
+            f"{padding_fraction(lengths, batch_size):.1%} -> {padding_fraction(packed_lengths, batch_size):.1%}"
+        )
+    else:
+        result = tokenized
+
+    result.save_to_disk(str(path))
+    return result
+
+
+# ===============================
+# Collator
+# ===============================
+class PackedCollator:
+    """
+    Right-pads packed rows to the batch maximum. With flash attention the
+    restarting position_ids mark example boundaries by themselves, so the batch
+    is flattened into one row; otherwise a 4D block-diagonal causal mask keeps
+    each example from attending to its neighbours
+    """
+
+    def __init__(self, pad_token_id, attn_implementation="sdpa", dtype=torch.float32):
+        self.pad_token_id = pad_token_id
+        self.flatten = attn_implementation == "flash_attention_2"
+        self.dtype = dtype
+
+    def _flattened(self, features):
+        return {
+            "input_ids": torch.tensor([sum((f["input_ids"] for f in features), [])]),
+            "labels": torch.tensor([sum((f["labels"] for f in features), [])]),
+            "position_ids": torch.tensor([sum((f["position_ids"] for f in features), [])]),
+        }
+
+    def __call__(self, features):
+        if self.flatten:
+            return self._flattened(features)
+
+        length = max(len(f["input_ids"]) for f in features)
+        batch = len(features)
+        input_ids = torch.full((batch, length), self.pad_token_id)
+        labels = torch.full((batch, length), IGNORE_INDEX)
+        position_ids = torch.zeros((batch, length), dtype=torch.long)
+        segments = torch.full((batch, length), -1)
+
+        for b, f in enumerate(features):
+            n = len(f["input_ids"])
+            input_ids[b, :n] = torch.tensor(f["input_ids"])
+            labels[b, :n] = torch.tensor(f["labels"])
+            position_ids[b, :n] = torch.tensor(f["position_ids"])
+            # A new segment starts wherever the position resets to 0
+            segments[b, :n] = torch.cumsum(position_ids[b, :n] == 0, dim=0)
+
+        causal = torch.tril(torch.ones(length, length, dtype=torch.bool))
+        same_segment = segments[:, :, None] == segments[:, None, :]
+        allowed = causal & same_segment & (segments[:, None, :] >= 0)
+        # Padding positions attend to themselves so no row is fully masked
+        allowed |= torch.eye(length, dtype=torch.bool)
+
+        mask = torch.zeros((batch, 1, length, length), dtype=self.dtype)
+        mask.masked_fill_(~allowed[:, None], torch.finfo(self.dtype).min)
+
+        return {
+            "input_ids": input_ids,
+            "labels": labels,
+            "position_ids": position_ids,
+            "attention_mask": mask,
+        }
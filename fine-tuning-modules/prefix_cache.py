@@ -0,0 +1,106 @@
+# ===============================
+# Shared-Prefix KV Cache
+# ===============================
+import copy
+
+import torch
+from transformers import DynamicCache
+
+from prompts import PROMPT_PREFIX
+
+
+class PrefixCache:
+    """
+    KV state for the constant question that starts every prompt, computed once
+    per loaded model. Prompts that begin with the same tokens reuse a copy of it,
+    so only their own suffix is run through attention.
+    Left-padded batches are served by moving each row's padding between the
+    prefix and its suffix: the prefix then sits at positions 0..length-1 in
+    every row, and the attention mask keeps the padding out of the positions
+    generate() and expected_prices() derive from it
+    """
+
+    def __init__(self, model, tokenizer, device, prefix=PROMPT_PREFIX):
+        self.prefix_ids = tokenizer(prefix, return_tensors="pt")["input_ids"].to(device)
+        self.length = self.prefix_ids.shape[1]
+        self.pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+
+        with torch.inference_mode():
+            self.cache = model(
+                input_ids=self.prefix_ids,
+                past_key_values=DynamicCache(),
+                use_cache=True,
+            ).past_key_values
+
+        self.hits = 0
+        self.misses = 0
+
+    def _suffixes(self, inputs):
+        """Each row's tokens after the prefix, or None unless every row starts with it"""
+        suffixes = []
+        for ids, mask in zip(inputs["input_ids"], inputs["attention_mask"]):
+            tokens = ids[mask.bool()]
+            if len(tokens) <= self.length or not torch.equal(tokens[: self.length], self.prefix_ids[0]):
+                return None
+            suffixes.append(tokens[self.length :])
+        return suffixes
+
+    def matches(self, inputs) -> bool:
+        return self._suffixes(inputs) is not None
+
+    def _lookup(self, inputs):
+        """(input ids with the prefix aligned at the start, attention mask, cache), or None on a miss"""
+        suffixes = self._suffixes(inputs)
+        if suffixes is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        batch, width = len(suffixes), max(len(suffix) for suffix in suffixes)
+        ids = inputs["input_ids"]
+        suffix_ids = torch.full((batch, width), self.pad_token_id, dtype=ids.dtype, device=ids.device)
+        suffix_mask = torch.zeros((batch, width), dtype=inputs["attention_mask"].dtype, device=ids.device)
+        for row, suffix in enumerate(suffixes):
+            suffix_ids[row, width - len(suffix) :] = suffix
+            suffix_mask[row, width - len(suffix) :] = 1
+
+        input_ids = torch.cat([self.prefix_ids.expand(batch, -1), suffix_ids], dim=1)
+        attention_mask = torch.cat([torch.ones_like(input_ids[:, : self.length], dtype=suffix_mask.dtype), suffix_mask], dim=1)
+
+        # generate() and forward() extend the cache in place
+        cache = copy.deepcopy(self.cache)
+        if batch > 1:
+            cache.batch_repeat_interleave(batch)
+        return input_ids, attention_mask, cache
+
+    def generate_inputs(self, inputs):
+        """
+        generate() skips positions already held in the cache, so the full prompt
+        goes along with it. The rows keep their length, so the caller's prompt
+        length still marks where the generated tokens start
+        """
+        found = self._lookup(inputs)
+        if found is None:
+            return inputs
+        input_ids, attention_mask, cache = found
+        return {"input_ids": input_ids, "attention_mask": attention_mask, "past_key_values": cache}
+
+    def forward_inputs(self, inputs):
+        """A plain forward pass needs the cached positions cut off the input ids"""
+        found = self._lookup(inputs)
+        if found is None:
+            return inputs
+        input_ids, attention_mask, cache = found
+        return {
+            "input_ids": input_ids[:, self.length :],
+            "attention_mask": attention_mask,
+            "past_key_values": cache,
+        }
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "prefix_tokens": self.length,
+            "prefix_cache_hits": self.hits,
+            "prefix_cache_hit_rate": self.hits / lookups if lookups else 0.0,
+        }
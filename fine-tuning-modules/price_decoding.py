@@ -0,0 +1,120 @@
+# ===============================
+# Numeric Price Decoding
+# ===============================
+import re
+
+import torch
+from transformers import LogitsProcessor, StoppingCriteria
+
+PREFIX = "Price is $"
+
+NUMERIC_TOKEN = re.compile(r"^\d*\.?\d*$")
+INTEGER_TOKEN = re.compile(r"^\d+$")
+COMPLETE_PRICE = re.compile(r"^\d+\.\d{2}")
+
+
+def with_prefix(prompt: str) -> str:
+    """Constrained modes need the prompt to end right where the number starts"""
+    if prompt.rstrip().endswith(PREFIX):
+        return prompt.rstrip()
+    return f"{prompt.rstrip()}\n\n{PREFIX}"
+
+
+class PriceVocab:
+    """Token ids that can appear in a price, computed once per tokenizer"""
+
+    def __init__(self, tokenizer):
+        self.eos_token_id = tokenizer.eos_token_id
+        numeric, dots, integers, values = [], [], [], []
+
+        for token_id in range(len(tokenizer)):
+            text = tokenizer.decode([token_id])
+            if not text or not NUMERIC_TOKEN.match(text):
+                continue
+            numeric.append(token_id)
+            if "." in text:
+                dots.append(token_id)
+            elif INTEGER_TOKEN.match(text):
+                integers.append(token_id)
+                values.append(float(text))
+
+        self.numeric_ids = torch.tensor(numeric)
+        self.dot_ids = torch.tensor(dots)
+        self.integer_ids = torch.tensor(integers)
+        self.integer_values = torch.tensor(values)
+
+    def mask(self, ids, size):
+        allowed = torch.zeros(size, dtype=torch.bool)
+        allowed[ids[ids < size]] = True
+        return allowed
+
+
+class PriceLogitsProcessor(LogitsProcessor):
+    """
+    Only lets the model emit digits and a single decimal point: the first token
+    must be an integer, a second '.' is never allowed, and EOS is allowed once
+    at least one token has been generated
+    """
+
+    def __init__(self, vocab: PriceVocab, prompt_len: int):
+        self.vocab = vocab
+        self.prompt_len = prompt_len
+        self._masks = None
+
+    def _build_masks(self, size, device):
+        numeric = self.vocab.mask(self.vocab.numeric_ids, size)
+        dots = self.vocab.mask(self.vocab.dot_ids, size)
+        first = self.vocab.mask(self.vocab.integer_ids, size)
+        after_dot = numeric & ~dots
+        if self.vocab.eos_token_id is not None:
+            numeric[self.vocab.eos_token_id] = True
+            after_dot[self.vocab.eos_token_id] = True
+        self._masks = tuple(m.to(device) for m in (first, numeric, after_dot))
+
+    def __call__(self, input_ids, scores):
+        if self._masks is None:
+            self._build_masks(scores.shape[-1], scores.device)
+        first, numeric, after_dot = self._masks
+
+        generated = input_ids[:, self.prompt_len :]
+        if generated.shape[1] == 0:
+            allowed = first.expand_as(scores)
+        else:
+            has_dot = torch.isin(generated, self.vocab.dot_ids.to(generated.device)).any(dim=1)
+            allowed = torch.where(has_dot[:, None], after_dot, numeric)
+
+        return scores.masked_fill(~allowed, float("-inf"))
+
+
+class PriceStoppingCriteria(StoppingCriteria):
+    """Stop each sequence as soon as it holds a complete price like 123.00"""
+
+    def __init__(self, tokenizer, prompt_len: int):
+        self.tokenizer = tokenizer
+        self.prompt_len = prompt_len
+
+    def __call__(self, input_ids, scores, **kwargs):
+        texts = self.tokenizer.batch_decode(input_ids[:, self.prompt_len :], skip_special_tokens=True)
+        done = [bool(COMPLETE_PRICE.match(text)) for text in texts]
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+
+def expected_prices(model, inputs, vocab: PriceVocab) -> list[float]:
+    """
+    One forward pass: the probability-weighted mean over integer tokens at the
+    position after the prefix. Llama 3 encodes numbers below 1000 as a single
+    token, so this covers every whole-dollar price in the dataset
+    """
+    # generate() derives positions from the attention mask; a bare forward pass
+    # doesn't, so left-padded rows would otherwise start counting at the padding.
+    # With a prefix cache the input ids are only the suffix, hence the slice
+    if "position_ids" not in inputs:
+        positions = (inputs["attention_mask"].long().cumsum(-1) - 1).clamp(min=0)
+        inputs = {**inputs, "position_ids": positions[:, -inputs["input_ids"].shape[1] :]}
+
+    with torch.inference_mode():
+        logits = model(**inputs).logits[:, -1, :]
+
+    ids = vocab.integer_ids.to(logits.device)
+    probs = torch.softmax(logits[:, ids].float(), dim=-1)
+    return (probs * vocab.integer_values.to(logits.device)).sum(dim=-1).tolist()
@@ -0,0 +1,6 @@
+# ===============================
+# Prompt Text
+# ===============================
+# Kept free of heavy imports so serving code can build prompts before torch loads
+QUESTION = "What is the price of the product, rounded to the nearest dollar?"
+PROMPT_PREFIX = f"{QUESTION}\n\n"
@@ -0,0 +1,170 @@
+# ===============================
+# Rewrite Cache
+# ===============================
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from eval_config import CFG
+
+
+def normalize(content: str) -> str:
+    return " ".join(content.split())
+
+
+def cache_key(content: str, system_prompt: str, model: str) -> str:
+    payload = "\x00".join([model, system_prompt, normalize(content)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RewriteCache:
+    """
+    Two-tier cache for description rewrites: an in-memory LRU in front of one
+    JSON file per key under directory (e.g. the mounted volume), so rewrites
+    survive container restarts and are shared between containers.
+    commit publishes new files (e.g. volume.commit); it runs from a background
+    thread every commit_interval seconds when something was written, and on
+    close(), never in the request path. reload picks up files other writers
+    committed (e.g. volume.reload); it runs on a disk miss, at most once every
+    reload_interval seconds
+    """
+
+    def __init__(self, directory=None, capacity=None, commit=None, reload=None, commit_interval=None, reload_interval=None):
+        self.directory = Path(directory) if directory else None
+        self.capacity = capacity or CFG["serving"]["rewrite_cache_size"]
+        self.commit = commit
+        self.reload = reload
+        if commit_interval is None:
+            commit_interval = CFG["serving"]["rewrite_cache_commit_interval"]
+        if reload_interval is None:
+            reload_interval = CFG["serving"]["rewrite_cache_reload_interval"]
+        self.commit_interval = commit_interval
+        self.reload_interval = reload_interval
+
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.commits = 0
+        self.reloads = 0
+
+        self._dirty = threading.Event()
+        self._closed = threading.Event()
+        self._last_reload = time.monotonic()
+        self._committer = None
+        if self.commit is not None:
+            self._committer = threading.Thread(target=self._commit_loop, name="rewrite-cache-commit", daemon=True)
+            self._committer.start()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def _read(self, key):
+        path = self._path(key)
+        if not path.exists():
+            return None
+        with path.open() as f:
+            return json.load(f)["rewrite"]
+
+    def get(self, key):
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return self.memory[key]
+
+        if self.directory is not None:
+            value = self._read(key)
+            if value is None and self.refresh():
+                value = self._read(key)
+            if value is not None:
+                with self.lock:
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                return value
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        with self.lock:
+            self._remember(key, value)
+
+        if self.directory is not None:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with tmp.open("w") as f:
+                json.dump({"rewrite": value}, f)
+            tmp.replace(path)
+            self._dirty.set()
+
+    # ---------- Sharing across containers ----------
+
+    def flush(self):
+        """Commit pending writes now; a failed commit is retried on the next one"""
+        if self.commit is None or not self._dirty.is_set():
+            return
+        self._dirty.clear()
+        try:
+            self.commit()
+            self.commits += 1
+        except Exception as e:
+            self._dirty.set()
+            print(f"Rewrite cache commit failed: {e}")
+
+    def _commit_loop(self):
+        while not self._closed.wait(self.commit_interval):
+            self.flush()
+
+    def refresh(self) -> bool:
+        """Reload other writers' files, unless that happened within reload_interval; True if it ran"""
+        if self.reload is None:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            if now - self._last_reload < self.reload_interval:
+                return False
+            self._last_reload = now
+
+        # Publish our own writes first so the reload can't drop them
+        self.flush()
+        try:
+            self.reload()
+        except Exception as e:
+            print(f"Rewrite cache reload failed: {e}")
+            return False
+        self.reloads += 1
+        return True
+
+    def close(self):
+        """Stop the committer and commit whatever is still pending"""
+        self._closed.set()
+        if self._committer is not None:
+            self._committer.join()
+        self.flush()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "rewrite_cache_memory_hits": self.memory_hits,
+            "rewrite_cache_disk_hits": self.disk_hits,
+            "rewrite_cache_misses": self.misses,
+            "rewrite_cache_hit_rate": hits / lookups if lookups else 0.0,
+            "rewrite_cache_commits": self.commits,
+            "rewrite_cache_reloads": self.reloads,
+        }
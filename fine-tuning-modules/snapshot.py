@@ -0,0 +1,133 @@
+# ===============================
+# Offline Dataset Snapshots
+# ===============================
+# Materializes one revision of a Hub dataset as a local Arrow directory with a
+# checksum manifest, so training and evaluation start without the network:
+#   python snapshot.py ed-donner/items_prompts_lite --revision <commit> --output snapshots/items_prompts_lite
+#   python snapshot.py --verify snapshots/items_prompts_lite
+# Then set dataset.snapshot in config.yaml / eval_config.yaml to the output directory.
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from datasets import load_dataset, load_from_disk
+from dotenv import load_dotenv
+from huggingface_hub import HfApi
+
+MANIFEST = "manifest.json"
+CHUNK = 1 << 20
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def resolve_revision(name, revision=None, token=None):
+    """Pin a branch or tag to the commit it points at today"""
+    return HfApi(token=token).dataset_info(name, revision=revision).sha
+
+
+def create_snapshot(name, output_dir, revision=None, token=None):
+    """
+    Downloads name@revision, saves it with save_to_disk and writes a manifest of
+    the resolved commit, split sizes and a sha256 per file. The directory is
+    built next to output_dir and renamed into place, so a crash never leaves a
+    half-written snapshot behind
+    """
+    start = time.perf_counter()
+    output_dir = Path(output_dir)
+    commit = resolve_revision(name, revision, token)
+    dataset = load_dataset(name, revision=commit, token=token)
+
+    staging = output_dir.with_name(output_dir.name + ".partial")
+    shutil.rmtree(staging, ignore_errors=True)
+    dataset.save_to_disk(str(staging))
+
+    files = sorted(path for path in staging.rglob("*") if path.is_file())
+    manifest = {
+        "dataset": name,
+        "revision": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "splits": {split: dataset[split].num_rows for split in dataset},
+        "files": {
+            str(path.relative_to(staging)): {"size": path.stat().st_size, "sha256": file_sha256(path)}
+            for path in files
+        },
+    }
+    (staging / MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    staging.rename(output_dir)
+
+    print(f"Snapshot of {name}@{commit[:8]} written to {output_dir} in {time.perf_counter() - start:.1f}s")
+    return manifest
+
+
+def verify_snapshot(snapshot_dir, checksums=True):
+    """
+    Checks every file in the manifest is present with the recorded size and,
+    with checksums=True, the recorded sha256. Raises SnapshotError on mismatch
+    """
+    snapshot_dir = Path(snapshot_dir)
+    manifest_path = snapshot_dir / MANIFEST
+    if not manifest_path.exists():
+        raise SnapshotError(f"No {MANIFEST} in {snapshot_dir}; create it with snapshot.py")
+    manifest = json.loads(manifest_path.read_text())
+
+    for relative, expected in manifest["files"].items():
+        path = snapshot_dir / relative
+        if not path.exists():
+            raise SnapshotError(f"{path} is missing")
+        if path.stat().st_size != expected["size"]:
+            raise SnapshotError(f"{path} is {path.stat().st_size} bytes, manifest says {expected['size']}")
+        if checksums and file_sha256(path) != expected["sha256"]:
+            raise SnapshotError(f"{path} does not match its sha256 in the manifest")
+    return manifest
+
+
+def load_snapshot(snapshot_dir, checksums=False):
+    """
+    Memory-maps the snapshot's Arrow files. Sizes are always checked; full
+    checksums read every byte, so they are opt-in here and run by --verify
+    """
+    manifest = verify_snapshot(snapshot_dir, checksums=checksums)
+    print(f"Loaded {manifest['dataset']}@{manifest['revision'][:8]} from {snapshot_dir}")
+    return load_from_disk(str(snapshot_dir))
+
+
+def load_dataset_or_snapshot(name, snapshot_dir=None):
+    """The configured snapshot if there is one, otherwise the Hub dataset"""
+    if snapshot_dir:
+        return load_snapshot(snapshot_dir)
+    return load_dataset(name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or verify an offline dataset snapshot")
+    parser.add_argument("dataset", nargs="?", help="Hub dataset, e.g. ed-donner/items_prompts_lite")
+    parser.add_argument("--revision", default=None, help="Branch, tag or commit (default: main)")
+    parser.add_argument("--output", help="Snapshot directory to create")
+    parser.add_argument("--verify", metavar="SNAPSHOT", help="Check an existing snapshot's checksums")
+    args = parser.parse_args()
+
+    if args.verify:
+        manifest = verify_snapshot(args.verify)
+        print(f"{args.verify}: {len(manifest['files'])} files match {manifest['dataset']}@{manifest['revision'][:8]}")
+    elif args.dataset and args.output:
+        load_dotenv(override=True)
+        create_snapshot(args.dataset, args.output, args.revision, token=os.getenv("HF_TOKEN"))
+    else:
+        parser.error("pass a dataset and --output, or --verify SNAPSHOT")
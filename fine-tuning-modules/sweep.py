@@ -0,0 +1,151 @@
+# ===============================
+# Checkpoint Sweep Script
+# ===============================
+# Evaluates several adapter revisions against one loaded base model:
+#   python sweep.py --revisions abc1234 def5678 main --size 500
+# Each revision is attached as a named adapter and switched in for its pass,
+# so login, dataset download and base model load/quantization happen once.
+# Importing this module has no side effects; main() does the work.
+import argparse
+import csv
+import json
+import os
+import time
+from pathlib import Path
+
+from huggingface_hub import login
+from peft import PeftModel
+from transformers import set_seed
+
+from eval_config import CFG, get_dataset_name, get_hub_model_name
+from eval_model import load_base_model, load_tokenizer
+from inference import Predictor, prompt_length
+from snapshot import load_dataset_or_snapshot
+from pricer.evaluate import DEFAULT_SIZE, evaluate
+
+TABLE_COLUMNS = ["revision", "size", "avg_error", "ci_95", "mse", "r2", "latency_p50", "predictions_per_sec"]
+
+
+# ===============================
+# Arguments
+# ===============================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare adapter revisions on one loaded base model")
+    parser.add_argument("--revisions", nargs="+", default=None, help="Default: sweep.revisions")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE)
+    parser.add_argument("--batch-size", type=int, default=None, help="Default: generation.eval_batch_size")
+    parser.add_argument("--output-dir", default="sweep_results")
+    parser.add_argument("--config", default=None, help="eval_config.yaml to use instead of the one next to this script")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        CFG.set_path(args.config)
+    args.revisions = args.revisions or CFG["sweep"]["revisions"]
+    args.batch_size = args.batch_size or CFG["generation"]["eval_batch_size"]
+    if not args.revisions:
+        parser.error("no revisions given (pass --revisions or set sweep.revisions in eval_config.yaml)")
+    return args
+
+
+# ===============================
+# Model: one base, one named adapter per revision
+# ===============================
+def load_adapters(revisions):
+    start = time.perf_counter()
+    tokenizer = load_tokenizer()
+    base_model, _ = load_base_model()
+    base_time = time.perf_counter() - start
+
+    adapters = {}
+    model = None
+    for i, revision in enumerate(revisions):
+        name = f"rev{i}"
+        if model is None:
+            model = PeftModel.from_pretrained(base_model, get_hub_model_name(), revision=revision, adapter_name=name)
+        else:
+            model.load_adapter(get_hub_model_name(), adapter_name=name, revision=revision)
+        adapters[revision] = name
+
+    print(f"Base model loaded once in {base_time:.1f}s; {len(adapters)} adapters in {time.perf_counter() - start - base_time:.1f}s")
+    return model, tokenizer, adapters
+
+
+# ===============================
+# Sweep
+# ===============================
+def sweep(model, tokenizer, adapters, test_dataset, args):
+    # The prefix KV state depends on the active adapter, so it can't be shared across passes
+    predictor = Predictor(loader=lambda: (model, tokenizer), prefix_cache=False)
+
+    def predict_batch(items):
+        return predictor.predict_batch([item["prompt"] for item in items])
+
+    output_dir = Path(args.output_dir)
+    table = []
+
+    for revision, name in adapters.items():
+        model.set_adapter(name)
+        set_seed(CFG["generation"]["seed"])
+
+        metrics = evaluate(
+            predict_batch,
+            test_dataset,
+            size=args.size,
+            workers=1,
+            output_dir=output_dir / revision,
+            columns=["prompt", "completion"],
+            batch_size=args.batch_size,
+            sort_key=prompt_length,
+            title=f"Revision {revision}",
+        )
+        table.append(
+            {
+                "revision": revision,
+                "size": metrics["size"],
+                "avg_error": metrics["avg_error"],
+                "ci_95": metrics["ci_95"],
+                "mse": metrics["mse"],
+                "r2": metrics["r2"],
+                "latency_p50": metrics["latency"]["p50"],
+                "predictions_per_sec": metrics["latency"]["predictions_per_sec"],
+            }
+        )
+    return table
+
+
+# ===============================
+# Comparison Table
+# ===============================
+def write_table(table, output_dir):
+    output_dir = Path(output_dir)
+    with (output_dir / "sweep.json").open("w") as f:
+        json.dump(table, f, indent=2)
+
+    with (output_dir / "sweep.csv").open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TABLE_COLUMNS)
+        writer.writeheader()
+        writer.writerows(table)
+
+    print(f"\n{'Revision':<24}{'Error':>10}{'±95%':>9}{'MSE':>10}{'r²':>8}")
+    for row in sorted(table, key=lambda r: r["avg_error"]):
+        print(
+            f"{row['revision']:<24}${row['avg_error']:>9,.2f}{row['ci_95']:>9,.2f}"
+            f"{row['mse']:>10,.0f}{row['r2'] * 100:>7.1f}%"
+        )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # With a dataset snapshot and a cached model, HF_HUB_OFFLINE=1 runs without the network
+    if not os.getenv("HF_HUB_OFFLINE"):
+        login(CFG.env("HF_TOKEN"), add_to_git_credential=True)
+    test_dataset = load_dataset_or_snapshot(get_dataset_name(), CFG["dataset"]["snapshot"])["test"]
+
+    model, tokenizer, adapters = load_adapters(args.revisions)
+    table = sweep(model, tokenizer, adapters, test_dataset, args)
+    write_table(table, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# ===============================
+# Training Throughput Callback
+# ===============================
+# Per-step wall time split into data fetch, forward, backward and optimizer,
+# plus real (non-padding) tokens/sec and peak memory, written to a local CSV and
+# JSON summary whether or not wandb is on. A short CPU run with a small model,
+# from this directory with the repo root on PYTHONPATH:
+#   python throughput.py --steps 10 --batch-size 4
+import argparse
+import csv
+import json
+import resource
+import time
+from pathlib import Path
+
+import torch
+from transformers import TrainerCallback
+
+from pricer.latency import percentile
+
+FIELDS = [
+    "step",
+    "step_time",
+    "data_time",
+    "forward_time",
+    "backward_time",
+    "optimizer_time",
+    "real_tokens",
+    "padded_tokens",
+    "padding_ratio",
+    "tokens_per_sec",
+    "peak_memory_mb",
+]
+
+
+def count_tokens(inputs):
+    """
+    (real, padded) token counts for one forward call. A 2D attention mask gives
+    the real count directly; right-padded packed rows carry position_ids, and a
+    row's real length ends after its last non-zero position; otherwise every
+    position counts as real
+    """
+    input_ids = inputs["input_ids"]
+    padded = input_ids.numel()
+    attention_mask = inputs.get("attention_mask")
+    position_ids = inputs.get("position_ids")
+
+    if attention_mask is not None and attention_mask.dim() == 2:
+        return int(attention_mask.sum()), padded
+    if position_ids is not None:
+        index = torch.arange(1, position_ids.shape[-1] + 1, device=position_ids.device)
+        real = (index * (position_ids != 0)).max(dim=-1).values
+        return int(real.sum()), padded
+    return padded, padded
+
+
+def peak_memory_mb(device):
+    if device.type == "cuda":
+        return torch.cuda.max_memory_allocated(device) / 1e6
+    # ru_maxrss is the process high-water mark in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+class ThroughputCallback(TrainerCallback):
+    """
+    Records one row per optimizer step:
+      data_time       previous step end -> step begin (dataloader wait)
+      forward_time    summed model forward calls, via forward hooks
+      backward_time   rest of the step up to the optimizer
+      optimizer_time  optimizer, scheduler and zero_grad
+    CUDA work is asynchronous, so each boundary synchronizes by default; pass
+    synchronize=False to measure without perturbing the run.
+    Rows go to <output_dir>/throughput.csv as they arrive and a summary to
+    throughput.json at the end of training
+    """
+
+    def __init__(self, output_dir, synchronize=True, report_to_wandb=False):
+        self.output_dir = Path(output_dir)
+        self.synchronize = synchronize
+        self.report_to_wandb = report_to_wandb
+        self.rows = []
+        self._hooks = []
+        self._device = torch.device("cpu")
+
+    def _now(self):
+        if self.synchronize and self._device.type == "cuda":
+            torch.cuda.synchronize(self._device)
+        return time.perf_counter()
+
+    # -------- forward hooks --------
+    def _before_forward(self, module, args, kwargs):
+        if module.training:
+            self._forward_start = self._now()
+            real, padded = count_tokens(kwargs)
+            self._real_tokens += real
+            self._padded_tokens += padded
+
+    def _after_forward(self, module, args, kwargs, output):
+        if module.training:
+            self._forward_time += self._now() - self._forward_start
+
+    # -------- trainer events --------
+    def on_train_begin(self, args, state, control, model=None, **kwargs):
+        self._device = args.device
+        self._hooks = [
+            model.register_forward_pre_hook(self._before_forward, with_kwargs=True),
+            model.register_forward_hook(self._after_forward, with_kwargs=True),
+        ]
+        if state.is_world_process_zero:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._csv_file = open(self.output_dir / "throughput.csv", "w", newline="")
+            self._csv = csv.DictWriter(self._csv_file, fieldnames=FIELDS)
+            self._csv.writeheader()
+        self._train_start = self._step_end = self._now()
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        self._step_begin = self._now()
+        self._optimizer_begin = None
+        self._forward_time = 0.0
+        self._real_tokens = 0
+        self._padded_tokens = 0
+        if self._device.type == "cuda":
+            torch.cuda.reset_peak_memory_stats(self._device)
+
+    def on_pre_optimizer_step(self, args, state, control, **kwargs):
+        self._optimizer_begin = self._now()
+
+    def on_step_end(self, args, state, control, **kwargs):
+        end = self._now()
+        # Older transformers versions have no pre-optimizer event; the
+        # optimizer is then folded into backward_time
+        optimizer_begin = self._optimizer_begin or end
+        compute_time = end - self._step_begin
+        row = {
+            "step": state.global_step,
+            "step_time": end - self._step_end,
+            "data_time": self._step_begin - self._step_end,
+            "forward_time": self._forward_time,
+            "backward_time": optimizer_begin - self._step_begin - self._forward_time,
+            "optimizer_time": end - optimizer_begin,
+            "real_tokens": self._real_tokens,
+            "padded_tokens": self._padded_tokens,
+            "padding_ratio": 1 - self._real_tokens / self._padded_tokens if self._padded_tokens else 0.0,
+            "tokens_per_sec": self._real_tokens / compute_time if compute_time else 0.0,
+            "peak_memory_mb": peak_memory_mb(self._device),
+        }
+        self._step_end = end
+        self.rows.append(row)
+
+        if state.is_world_process_zero:
+            self._csv.writerow(row)
+            self._csv_file.flush()
+            if self.report_to_wandb:
+                import wandb
+
+                wandb.log({f"throughput/{k}": v for k, v in row.items() if k != "step"}, commit=False)
+
+    def on_train_end(self, args, state, control, **kwargs):
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+        if not state.is_world_process_zero:
+            return
+        self._csv_file.close()
+        summary = self.summary()
+        (self.output_dir / "throughput.json").write_text(json.dumps(summary, indent=2))
+        print(
+            f"{summary['steps']} steps, {summary['tokens_per_sec']:,.0f} tokens/sec, "
+            f"data {summary['data_share']:.1%} / forward {summary['forward_share']:.1%} / "
+            f"backward {summary['backward_share']:.1%} / optimizer {summary['optimizer_share']:.1%}, "
+            f"padding {summary['padding_ratio']:.1%}, peak {summary['peak_memory_mb']:,.0f} MB"
+        )
+
+    def summary(self) -> dict:
+        """Totals over all steps; *_share is each phase's fraction of step time"""
+        if not self.rows:
+            return {"steps": 0}
+
+        def total(key):
+            return sum(row[key] for row in self.rows)
+
+        step_time = total("step_time")
+        compute_time = step_time - total("data_time")
+        step_times = [row["step_time"] for row in self.rows]
+        return {
+            "steps": len(self.rows),
+            "step_time_mean": step_time / len(self.rows),
+            "step_time_p50": percentile(step_times, 50),
+            "step_time_p95": percentile(step_times, 95),
+            **{f"{name}_share": total(f"{name}_time") / step_time for name in ("data", "forward", "backward", "optimizer")},
+            "real_tokens": total("real_tokens"),
+            "padding_ratio": 1 - total("real_tokens") / total("padded_tokens") if total("padded_tokens") else 0.0,
+            "tokens_per_sec": total("real_tokens") / compute_time if compute_time else 0.0,
+            "peak_memory_mb": max(row["peak_memory_mb"] for row in self.rows),
+        }
+
+
+if __name__ == "__main__":
+    from datasets import Dataset
+    from transformers import Trainer, TrainingArguments
+
+    from benchmark_prefix_cache import BENCHMARK_MODEL, sample_prompts
+    from local_service import load_local
+    from packing import PackedCollator, pack, tokenize_example
+
+    parser = argparse.ArgumentParser(description="Measure training step throughput on CPU")
+    parser.add_argument("--model", default=BENCHMARK_MODEL)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--max-length", type=int, default=148)
+    parser.add_argument("--no-packing", action="store_true")
+    parser.add_argument("--output-dir", default="throughput_run")
+    args = parser.parse_args()
+
+    model, tokenizer = load_local(args.model)
+    examples = [
+        tokenize_example({"prompt": prompt, "completion": f"{10 + i}.99"}, tokenizer, args.max_length)
+        for i, prompt in enumerate(sample_prompts(args.steps * args.batch_size * 4))
+    ]
+    if args.no_packing:
+        train_dataset = Dataset.from_list(examples)
+    else:
+        train_dataset = pack(examples, args.max_length)
+
+    trainer = Trainer(
+        model=model,
+        args=TrainingArguments(
+            output_dir=args.output_dir,
+            max_steps=args.steps,
+            per_device_train_batch_size=args.batch_size,
+            learning_rate=1e-5,
+            use_cpu=True,
+            report_to=[],
+            save_strategy="no",
+            remove_unused_columns=False,
+        ),
+        train_dataset=train_dataset,
+        data_collator=PackedCollator(tokenizer.pad_token_id, attn_implementation=model.config._attn_implementation),
+        callbacks=[ThroughputCallback(args.output_dir)],
+    )
+    trainer.train()
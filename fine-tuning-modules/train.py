@@ -1,103 +1,164 @@
 # ===============================
 # Training Script
 # ===============================
+# Run from this directory with the repo root on PYTHONPATH:
+#   python train.py
+#   python train.py --config other_config.yaml
+# Importing this module has no side effects; main() does the work.
+import argparse
 import os
+import torch
 import wandb
-from datasets import load_dataset
 from huggingface_hub import login
 from trl import SFTTrainer, SFTConfig
 
 from config import (
     CFG,
     RUN_NAME,
-    PROJECT_RUN_NAME,
-    HUB_MODEL_NAME,
-    DATASET_NAME,
-    HF_TOKEN,
-    WANDB_API_KEY,
+    get_dataset_name,
+    get_hub_model_name,
+    get_project_run_name,
 )
 from model import load_model, load_tokenizer, get_lora_config
+from snapshot import load_dataset_or_snapshot
+from packing import PackedCollator, prepare_dataset
+from throughput import ThroughputCallback
 
 
 # ===============================
 # Auth & Logging
 # ===============================
-login(HF_TOKEN, add_to_git_credential=True)
+def setup_logging():
+    login(CFG.env("HF_TOKEN"), add_to_git_credential=True)
 
-if CFG["logging"]["use_wandb"]:
-    os.environ["WANDB_API_KEY"] = WANDB_API_KEY
-    wandb.init(
-        project=CFG["project"]["project_name"],
-        name=RUN_NAME,
-    )
+    if CFG["logging"]["use_wandb"]:
+        os.environ["WANDB_API_KEY"] = CFG.env("WANDB_API_KEY")
+        wandb.init(
+            project=CFG["project"]["project_name"],
+            name=RUN_NAME,
+        )
 
 
 # ===============================
 # Dataset
 # ===============================
-dataset = load_dataset(DATASET_NAME)
+def load_splits():
+    # A local snapshot (dataset.snapshot) skips the Hub download and is memory-mapped
+    dataset = load_dataset_or_snapshot(get_dataset_name(), CFG["dataset"]["snapshot"])
 
-train_dataset = dataset["train"]
-val_dataset = dataset["val"].select(range(CFG["dataset"]["val_size"]))
+    train_dataset = dataset["train"]
+    val_dataset = dataset["val"].select(range(CFG["dataset"]["val_size"]))
+    return train_dataset, val_dataset
 
 
 # ===============================
-# Model Setup
+# Tokenize & Pack (cached across runs)
 # ===============================
-tokenizer = load_tokenizer()
-model, use_bf16 = load_model()
-model.generation_config.pad_token_id = tokenizer.pad_token_id
-
-print(f"Memory footprint: {model.get_memory_footprint() / 1e9:.1f} GB")
+def tokenize_splits(train_dataset, val_dataset, tokenizer):
+    packing = CFG["training"]["packing"]
+    max_length = CFG["training"]["max_sequence_length"]
+
+    train_dataset = prepare_dataset(
+        train_dataset,
+        tokenizer,
+        max_length,
+        CFG["dataset"]["cache_dir"],
+        packing=packing,
+        batch_size=CFG["training"]["batch_size"],
+    )
+    val_dataset = prepare_dataset(val_dataset, tokenizer, max_length, CFG["dataset"]["cache_dir"], packing=packing)
+    return train_dataset, val_dataset
 
 
 # ===============================
 # Trainer Config
 # ===============================
-trainer_config = SFTConfig(
-    output_dir=PROJECT_RUN_NAME,
-    num_train_epochs=CFG["training"]["epochs"],
-    per_device_train_batch_size=CFG["training"]["batch_size"],
-    per_device_eval_batch_size=1,
-    gradient_accumulation_steps=CFG["training"]["gradient_accumulation_steps"],
-    optim=CFG["training"]["optimizer"],
-    save_steps=CFG["training"]["save_steps"],
-    save_total_limit=10,
-    logging_steps=CFG["training"]["log_steps"],
-    learning_rate=CFG["training"]["learning_rate"],
-    weight_decay=CFG["training"]["weight_decay"],
-    fp16=not use_bf16,
-    bf16=use_bf16,
-    warmup_ratio=CFG["training"]["warmup_ratio"],
-    lr_scheduler_type=CFG["training"]["lr_scheduler_type"],
-    max_length=CFG["training"]["max_sequence_length"],
-    group_by_length=True,
-    report_to="wandb" if CFG["logging"]["use_wandb"] else None,
-    run_name=RUN_NAME,
-    push_to_hub=True,
-    hub_model_id=HUB_MODEL_NAME,
-    hub_private_repo=True,
-    hub_strategy="every_save",
-    eval_strategy="steps",
-    eval_steps=CFG["training"]["save_steps"],
-)
+def get_trainer_config(use_bf16):
+    packing = CFG["training"]["packing"]
+
+    return SFTConfig(
+        output_dir=get_project_run_name(),
+        num_train_epochs=CFG["training"]["epochs"],
+        per_device_train_batch_size=CFG["training"]["batch_size"],
+        per_device_eval_batch_size=1,
+        gradient_accumulation_steps=CFG["training"]["gradient_accumulation_steps"],
+        optim=CFG["training"]["optimizer"],
+        save_steps=CFG["training"]["save_steps"],
+        save_total_limit=10,
+        logging_steps=CFG["training"]["log_steps"],
+        learning_rate=CFG["training"]["learning_rate"],
+        weight_decay=CFG["training"]["weight_decay"],
+        fp16=not use_bf16,
+        bf16=use_bf16,
+        warmup_ratio=CFG["training"]["warmup_ratio"],
+        lr_scheduler_type=CFG["training"]["lr_scheduler_type"],
+        max_length=CFG["training"]["max_sequence_length"],
+        # Packed rows are already close to max_length, so length grouping buys nothing
+        group_by_length=not packing,
+        dataset_kwargs={"skip_prepare_dataset": True},
+        remove_unused_columns=False,
+        report_to="wandb" if CFG["logging"]["use_wandb"] else None,
+        run_name=RUN_NAME,
+        push_to_hub=True,
+        hub_model_id=get_hub_model_name(),
+        hub_private_repo=True,
+        hub_strategy="every_save",
+        eval_strategy="steps",
+        eval_steps=CFG["training"]["save_steps"],
+    )
 
 
 # ===============================
 # Training
 # ===============================
-trainer = SFTTrainer(
-    model=model,
-    train_dataset=train_dataset,
-    eval_dataset=val_dataset,
-    peft_config=get_lora_config(),
-    args=trainer_config,
-)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fine-tune the price model with LoRA")
+    parser.add_argument("--config", default=None, help="config.yaml to use instead of the one next to this script")
+    args = parser.parse_args(argv)
+    if args.config:
+        CFG.set_path(args.config)
+
+    setup_logging()
+    train_dataset, val_dataset = load_splits()
+
+    tokenizer = load_tokenizer()
+    model, use_bf16 = load_model()
+    model.generation_config.pad_token_id = tokenizer.pad_token_id
+
+    print(f"Memory footprint: {model.get_memory_footprint() / 1e9:.1f} GB")
+
+    train_dataset, val_dataset = tokenize_splits(train_dataset, val_dataset, tokenizer)
+    collator = PackedCollator(
+        tokenizer.pad_token_id,
+        attn_implementation=model.config._attn_implementation,
+        dtype=torch.bfloat16 if use_bf16 else torch.float16,
+    )
+
+    project_run_name = get_project_run_name()
+    trainer = SFTTrainer(
+        model=model,
+        train_dataset=train_dataset,
+        eval_dataset=val_dataset,
+        peft_config=get_lora_config(),
+        args=get_trainer_config(use_bf16),
+        data_collator=collator,
+        callbacks=[
+            ThroughputCallback(
+                project_run_name,
+                synchronize=CFG["logging"]["sync_step_timing"],
+                report_to_wandb=CFG["logging"]["use_wandb"],
+            )
+        ],
+    )
+
+    trainer.train()
+    trainer.model.push_to_hub(project_run_name, private=True)
+
+    print(f"Saved to the hub: {project_run_name}")
 
-trainer.train()
-trainer.model.push_to_hub(PROJECT_RUN_NAME, private=True)
+    if CFG["logging"]["use_wandb"]:
+        wandb.finish()
 
-print(f"Saved to the hub: {PROJECT_RUN_NAME}")
 
-if CFG["logging"]["use_wandb"]:
-    wandb.finish()
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import re
+import time
 from sklearn.metrics import mean_squared_error, r2_score
 import pandas as pd
 import plotly.express as px
@@ -8,27 +9,30 @@ import math
 from tqdm.auto import tqdm
 from IPython.display import clear_output
 
-
-GREEN = "\033[92m"
-YELLOW = "\033[93m"
-RED = "\033[91m"
-RESET = "\033[0m"
-COLOR_MAP = {"red": RED, "orange": YELLOW, "green": GREEN}
+# The notebooks put the repo root on sys.path before importing this module
+from pricer.evaluate import COLOR_MAP, prefetch
+from pricer.latency import latency_summary, timed_call
 
 DEFAULT_SIZE = 200
+COLUMNS = ["prompt", "completion"]
 
 
 class Tester:
-    def __init__(self, predictor, data, title=None, size=DEFAULT_SIZE):
+    def __init__(self, predictor, data, title=None, size=DEFAULT_SIZE, columns=COLUMNS):
         self.predictor = predictor
         self.data = data
         self.title = title or self.make_title(predictor)
         self.size = size
+        self.columns = columns
+        self.rows = None
         self.titles = []
         self.guesses = []
         self.truths = []
         self.errors = []
         self.colors = []
+        self.latencies = []
+        self.phases = []
+        self.wall_time = 0.0
 
     @staticmethod
     def make_title(predictor) -> str:
@@ -52,8 +56,9 @@ class Tester:
             return "red"
 
     def run_datapoint(self, i):
-        datapoint = self.data[i]
-        value = self.predictor(datapoint)
+        datapoint = self.rows[i] if self.rows is not None else self.data[i]
+        value, (start, end), phases = timed_call(self.predictor, datapoint)
+        latency = end - start
         guess = self.post_process(value)
         truth = float(datapoint["completion"])
         error = abs(guess - truth)
@@ -61,7 +66,7 @@ class Tester:
         pieces = datapoint["prompt"].split("Title: ")
         title = pieces[1].split("\n")[0] if len(pieces) > 1 else pieces[0]
         title = title if len(title) <= 40 else title[:40] + "..."
-        return title, guess, truth, error, color
+        return title, guess, truth, error, color, latency, phases
 
     def chart(self, title):
         df = pd.DataFrame(
@@ -193,26 +198,62 @@ class Tester:
 
         fig.show()
 
+    def latency_metrics(self):
+        summary = latency_summary(self.latencies)
+        summary["predictions_per_sec"] = len(self.latencies) / self.wall_time if self.wall_time else 0.0
+        summary["mean_concurrency"] = sum(self.latencies) / self.wall_time if self.wall_time else 0.0
+        summary["wall_time"] = self.wall_time
+        names = sorted({name for phases in self.phases for name in phases})
+        summary["phases"] = {
+            name: latency_summary([phases.get(name, 0.0) for phases in self.phases]) for name in names
+        }
+        return summary
+
+    def metrics(self):
+        return {
+            "title": self.title,
+            "size": len(self.errors),
+            "avg_error": sum(self.errors) / len(self.errors),
+            "mse": float(mean_squared_error(self.truths, self.guesses)),
+            "r2": float(r2_score(self.truths, self.guesses)),
+            "latency": self.latency_metrics(),
+        }
+
     def report(self):
         average_error = sum(self.errors) / self.size
         mse = mean_squared_error(self.truths, self.guesses)
         r2 = r2_score(self.truths, self.guesses) * 100
         title = f"{self.title} results<br><b>Error:</b> ${average_error:,.2f} <b>MSE:</b> {mse:,.0f} <b>r²:</b> {r2:.1f}%"
+        latency = self.latency_metrics()
+        print(
+            f"Latency p50={latency['p50'] * 1000:,.0f}ms p95={latency['p95'] * 1000:,.0f}ms "
+            f"p99={latency['p99'] * 1000:,.0f}ms | {latency['predictions_per_sec']:,.2f} predictions/sec | "
+            f"concurrency={latency['mean_concurrency']:.1f}"
+        )
+        for name, stats in latency["phases"].items():
+            print(f"  {name}: mean={stats['mean'] * 1000:,.1f}ms p95={stats['p95'] * 1000:,.1f}ms")
         self.error_trend_chart()
         self.chart(title)
 
     def run(self):
+        self.rows = prefetch(self.data, range(self.size), self.columns)
+        started = time.perf_counter()
         for i in tqdm(range(self.size)):
-            title, guess, truth, error, color = self.run_datapoint(i)
+            title, guess, truth, error, color, latency, phases = self.run_datapoint(i)
             self.titles.append(title)
             self.guesses.append(guess)
             self.truths.append(truth)
             self.errors.append(error)
             self.colors.append(color)
+            self.latencies.append(latency)
+            self.phases.append(phases)
             print(f"{COLOR_MAP[color]}${error:.0f} ", end="")
+        self.wall_time = time.perf_counter() - started
         clear_output(wait=True)
         self.report()
 
 
 def evaluate(function, data, size=DEFAULT_SIZE):
-    Tester(function, data, size=size).run()
+    tester = Tester(function, data, size=size)
+    tester.run()
+    return tester.metrics()
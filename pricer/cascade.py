@@ -0,0 +1,306 @@
+import json
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import cross_val_predict
+
+from pricer.items import summary_from_prompt
+from pricer.parser import MAX_PRICE, MIN_PRICE
+
+
+# -------------------- Constants --------------------
+
+# Escalate when the cheap model expects its log-price error to exceed this;
+# 0.35 is roughly "more than ~40% off"
+DEFAULT_THRESHOLD = 0.35
+DEFAULT_THRESHOLDS = (0.15, 0.2, 0.25, 0.3, 0.35, 0.4, 0.5, 0.6, 0.8)
+
+# The saved model is plain arrays plus JSON, so it loads under any
+# scikit-learn version rather than only the one that pickled it
+FORMAT_VERSION = 1
+TFIDF_SETTINGS = {"stop_words": "english", "ngram_range": (1, 2), "sublinear_tf": True}
+
+
+# -------------------- Text --------------------
+
+def text_of(dp):
+    """Items carry a summary; prompt datasets wrap it in the question and price prefix"""
+    summary = getattr(dp, "summary", None)
+    if summary:
+        return summary
+    return summary_from_prompt(dp["prompt"])
+
+
+# -------------------- Cheap Model --------------------
+
+class BaselinePricer:
+    """
+    The traditional-ML baseline from notebooks/ml_experiments (TF-IDF over
+    word uni/bigrams into a Ridge regression, here on log price), plus a second
+    Ridge on the same features that predicts the first one's absolute log
+    error. It is fitted on out-of-fold residuals, so it learns where the
+    baseline is unreliable rather than where it memorised the training set
+    """
+
+    def __init__(self, max_features=20_000, alpha=1.0, folds=5):
+        self.vectorizer = TfidfVectorizer(max_features=max_features, **TFIDF_SETTINGS)
+        self.alpha = alpha
+        self.folds = folds
+        # (coefficients, intercept) of each Ridge; prediction is a sparse dot product
+        self.price_weights = None
+        self.error_weights = None
+
+    def fit(self, texts, prices):
+        X = self.vectorizer.fit_transform(texts)
+        y = np.log1p(np.asarray(prices, dtype=float))
+
+        out_of_fold = cross_val_predict(Ridge(alpha=self.alpha), X, y, cv=self.folds)
+        error_model = Ridge(alpha=self.alpha).fit(X, np.abs(out_of_fold - y))
+        price_model = Ridge(alpha=self.alpha).fit(X, y)
+        self.price_weights = (price_model.coef_, float(price_model.intercept_))
+        self.error_weights = (error_model.coef_, float(error_model.intercept_))
+        return self
+
+    def predict_with_uncertainty(self, texts):
+        """Prices and the expected absolute log error of each one"""
+        X = self.vectorizer.transform(texts)
+        log_prices = X @ self.price_weights[0] + self.price_weights[1]
+        prices = np.clip(np.expm1(log_prices), MIN_PRICE, MAX_PRICE)
+        uncertainty = np.maximum(X @ self.error_weights[0] + self.error_weights[1], 0.0)
+        return prices, uncertainty
+
+    def predict(self, texts):
+        return self.predict_with_uncertainty(texts)[0]
+
+    def save(self, path):
+        """One uncompressed .npz: the TF-IDF vocabulary and idf, both Ridge models' weights, and the settings as JSON"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        config = {
+            "format": FORMAT_VERSION,
+            "max_features": self.vectorizer.max_features,
+            "alpha": self.alpha,
+            "folds": self.folds,
+        }
+        with path.open("wb") as f:
+            np.savez(
+                f,
+                terms=self.vectorizer.get_feature_names_out().astype(str),
+                idf=self.vectorizer.idf_,
+                price_coef=self.price_weights[0],
+                price_intercept=np.float64(self.price_weights[1]),
+                error_coef=self.error_weights[0],
+                error_intercept=np.float64(self.error_weights[1]),
+                config=np.array(json.dumps(config)),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as artifact:
+            config = json.loads(str(artifact["config"]))
+            if config["format"] != FORMAT_VERSION:
+                raise ValueError(f"{path} is format {config['format']}, expected {FORMAT_VERSION}")
+            model = cls(config["max_features"], config["alpha"], config["folds"])
+            vocabulary = {term: i for i, term in enumerate(artifact["terms"].tolist())}
+            model.vectorizer = TfidfVectorizer(vocabulary=vocabulary, **TFIDF_SETTINGS)
+            model.vectorizer.idf_ = artifact["idf"]
+            model.price_weights = (artifact["price_coef"], float(artifact["price_intercept"]))
+            model.error_weights = (artifact["error_coef"], float(artifact["error_intercept"]))
+        return model
+
+
+# -------------------- Cascade --------------------
+
+class CascadePredictor:
+    """
+    Prices a batch with the cheap model first and sends only the items whose
+    uncertainty is above threshold to expensive(texts) -> prices, e.g. the
+    fine-tuned LLM
+    """
+
+    def __init__(self, cheap, expensive, threshold=DEFAULT_THRESHOLD):
+        self.cheap = cheap
+        self.expensive = expensive
+        self.threshold = threshold
+        self.items = 0
+        self.escalated = 0
+
+    def predict_batch(self, texts):
+        """Returns (prices, escalated flags, uncertainties)"""
+        prices, uncertainty = self.cheap.predict_with_uncertainty(texts)
+        prices = [float(p) for p in prices]
+        escalate = [u > self.threshold for u in uncertainty]
+
+        hard = [i for i, flag in enumerate(escalate) if flag]
+        if hard:
+            for i, price in zip(hard, self.expensive([texts[i] for i in hard])):
+                prices[i] = price
+
+        self.items += len(texts)
+        self.escalated += len(hard)
+        return prices, escalate, [float(u) for u in uncertainty]
+
+    def stats(self):
+        return {
+            "cascade_threshold": self.threshold,
+            "cascade_items": self.items,
+            "cascade_escalated": self.escalated,
+            "cascade_escalation_rate": self.escalated / self.items if self.items else 0.0,
+        }
+
+
+# -------------------- Threshold Tuning --------------------
+
+def cascade_partial(partial, cheap_prices, uncertainty, threshold, cheap_seconds):
+    """
+    The LLM's partial results with every confident point replaced by the cheap
+    model's guess, so the harness can score the cascade without rerunning the LLM.
+    Cheap points keep their start time and take the cheap model's per-item latency
+    """
+    # The harness pulls in pandas and plotly; serving the cascade must not need them
+    from pricer.evaluate import Tester
+
+    points = []
+    for point in partial["points"]:
+        i = point["index"]
+        if uncertainty[i] > threshold:
+            points.append(point)
+            continue
+        guess = float(cheap_prices[i])
+        error = abs(guess - point["truth"])
+        start = point["span"][0]
+        points.append(
+            {
+                **point,
+                "guess": guess,
+                "error": error,
+                "color": Tester._color_for(error, point["truth"]),
+                "span": [start, start + cheap_seconds],
+                "phases": {"cheap": cheap_seconds},
+            }
+        )
+    return {**partial, "points": points}
+
+
+def tune_thresholds(cheap, data, llm_results_dir, thresholds=DEFAULT_THRESHOLDS, output_dir=None):
+    """
+    Scores the cascade at each threshold against LLM predictions already on
+    disk (evaluate.py / run_shard output for the same data). Returns one row per
+    threshold, plus the all-cheap and all-LLM ends, with the harness metrics and
+    the share of items that would reach the GPU
+    """
+    from pricer.evaluate import Tester, load_partials, prefetch
+
+    partials = load_partials(llm_results_dir)
+    indices = sorted(p["index"] for partial in partials for p in partial["points"])
+
+    texts = [text_of(row) for row in prefetch(data, indices)]
+    start = time.perf_counter()
+    prices, uncertainty = cheap.predict_with_uncertainty(texts)
+    cheap_seconds = (time.perf_counter() - start) / len(indices)
+    cheap_prices = dict(zip(indices, prices))
+    uncertainties = dict(zip(indices, uncertainty))
+
+    # -inf escalates everything (the LLM alone), inf nothing (the cheap model alone)
+    table = []
+    for threshold in [-math.inf, *sorted(thresholds), math.inf]:
+        cascade = [cascade_partial(p, cheap_prices, uncertainties, threshold, cheap_seconds) for p in partials]
+        metrics = Tester.from_partials(cascade).metrics()
+        escalated = sum(u > threshold for u in uncertainties.values())
+        table.append(
+            {
+                "label": {-math.inf: "all LLM", math.inf: "all cheap"}.get(threshold, f"{threshold:.2f}"),
+                "threshold": threshold if math.isfinite(threshold) else None,
+                "escalation_rate": escalated / len(indices),
+                "avg_error": metrics["avg_error"],
+                "ci_95": metrics["ci_95"],
+                "rmse": metrics["rmse"],
+                "r2": metrics["r2"],
+            }
+        )
+
+    if output_dir:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with (output_dir / "cascade_thresholds.json").open("w") as f:
+            json.dump(table, f, indent=2)
+    return table
+
+
+def pick_threshold(table, max_error_increase=0.05):
+    """
+    The lowest-escalation threshold whose average error is within
+    max_error_increase (relative) of sending everything to the LLM
+    """
+    llm_error = table[0]["avg_error"]
+    allowed = [
+        row
+        for row in table
+        if row["threshold"] is not None and row["avg_error"] <= llm_error * (1 + max_error_increase)
+    ]
+    return min(allowed, key=lambda row: row["escalation_rate"], default=None)
+
+
+def print_table(table):
+    print(f"{'Threshold':>10}{'To LLM':>9}{'Error':>10}{'±95%':>9}{'r²':>8}")
+    for row in table:
+        print(
+            f"{row['label']:>10}{row['escalation_rate']:>8.0%} ${row['avg_error']:>8,.2f}"
+            f"{row['ci_95']:>9,.2f}{row['r2'] * 100:>7.1f}%"
+        )
+
+
+# -------------------- Command Line --------------------
+
+if __name__ == "__main__":
+    # From the repo root:
+    #   python -m pricer.cascade fit --output models/baseline_pricer.npz
+    #   python -m pricer.cascade tune --model models/baseline_pricer.npz --llm-results fine-tuning-modules/eval_shards
+    import argparse
+
+    from datasets import load_dataset
+
+    from pricer.evaluate import Tester, prefetch
+
+    parser = argparse.ArgumentParser(description="Fit the cheap cascade model or tune its escalation threshold")
+    parser.add_argument("command", choices=["fit", "tune"])
+    parser.add_argument("--dataset", default="ed-donner/items_prompts_lite")
+    parser.add_argument("--model", default="models/baseline_pricer.npz")
+    parser.add_argument("--output", default=None, help="fit: where to save the model (default: --model)")
+    parser.add_argument("--max-train", type=int, default=None)
+    parser.add_argument("--llm-results", default="eval_shards", help="tune: shard results from the LLM on the test split")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--max-error-increase", type=float, default=0.05)
+    parser.add_argument("--output-dir", default="cascade_tuning")
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        train = load_dataset(args.dataset, split="train")
+        if args.max_train:
+            train = train.select(range(min(args.max_train, len(train))))
+        rows = prefetch(train, range(len(train)))
+        start = time.perf_counter()
+        model = BaselinePricer().fit([text_of(row) for row in rows], [Tester._truth_of(row) for row in rows])
+        model.save(args.output or args.model)
+        print(f"Fitted on {len(rows):,} items in {time.perf_counter() - start:.1f}s -> {args.output or args.model}")
+    else:
+        table = tune_thresholds(
+            BaselinePricer.load(args.model),
+            load_dataset(args.dataset, split="test"),
+            args.llm_results,
+            args.thresholds,
+            args.output_dir,
+        )
+        print_table(table)
+        best = pick_threshold(table, args.max_error_increase)
+        if best:
+            print(
+                f"\nThreshold {best['threshold']:.2f}: {best['escalation_rate']:.0%} of items reach the LLM, "
+                f"average error ${best['avg_error']:,.2f} (all LLM: ${table[0]['avg_error']:,.2f})"
+            )
+        else:
+            print(f"\nNo threshold keeps the error within {args.max_error_increase:.0%} of the LLM alone")
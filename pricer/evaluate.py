@@ -1,13 +1,20 @@
 import re
+import json
 import math
-from itertools import accumulate
+import time
+import random
+from pathlib import Path
+from collections import deque
+from itertools import accumulate, islice
 from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from sklearn.metrics import mean_squared_error, r2_score
-from tqdm.notebook import tqdm
+from tqdm.auto import tqdm
+
+from pricer.latency import latency_summary, timed_call
 
 
 # -------------------- Constants --------------------
@@ -15,6 +22,15 @@ from tqdm.notebook import tqdm
 WORKERS = 5
 DEFAULT_SIZE = 200
 
+# Sequential (early-stopping) evaluation
+Z_95 = 1.96
+MIN_SEQUENTIAL_SIZE = 30
+
+# Large-N charts
+WEBGL_THRESHOLD = 1_000
+MAX_SCATTER_POINTS = 5_000
+MAX_TREND_POINTS = 1_000
+
 GREEN = "\033[92m"
 YELLOW = "\033[93m"
 RED = "\033[91m"
@@ -26,23 +42,155 @@ COLOR_MAP = {
     "red": RED,
 }
 
+# Rows fetched per Arrow slice when prefetching from a Hugging Face Dataset
+PREFETCH_BLOCK = 1_000
+
+# Batched predictors: rows are length-sorted within windows of this many batches
+SORT_WINDOW_BATCHES = 16
+
+
+# -------------------- Timing --------------------
+
+def peak_concurrency(spans):
+    """Largest number of (start, end) spans that overlapped at any moment"""
+    events = sorted([(start, 1) for start, _ in spans] + [(end, -1) for _, end in spans])
+    peak = active = 0
+    for _, delta in events:
+        active += delta
+        peak = max(peak, active)
+    return peak
+
+
+# -------------------- Data Access --------------------
+
+class Row:
+    """
+    Lightweight view of one datapoint over prefetched column lists.
+    Supports both row["price"] and row.price so predictors written for
+    dataset dicts and for Item objects work unchanged
+    """
+
+    __slots__ = ("_columns", "_i")
+
+    def __init__(self, columns, i):
+        self._columns = columns
+        self._i = i
+
+    def __getitem__(self, key):
+        return self._columns[key][self._i]
+
+    def __getattr__(self, name):
+        # copy and pickle probe dunders on an instance whose slots aren't set
+        # yet; looking up self._columns there would recurse forever
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self._columns[name][self._i]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __contains__(self, key):
+        return key in self._columns
+
+    def get(self, key, default=None):
+        return self[key] if key in self._columns else default
+
+    def keys(self):
+        return self._columns.keys()
+
+    def __repr__(self):
+        return f"Row({ {k: self[k] for k in self._columns} })"
+
+
+def prefetch(data, indices, columns=None, block_size=PREFETCH_BLOCK):
+    """
+    Fetch the datapoints at indices before any prediction runs.
+    A Hugging Face Dataset is read column-wise in contiguous Arrow slices (or
+    batched gathers for shuffled indices) instead of decoding one row dict per
+    call; plain lists of Items are returned as-is
+    """
+    if not hasattr(data, "column_names"):
+        return [data[i] for i in indices]
+
+    indices = list(indices)
+    subset = data.select_columns(columns) if columns else data
+    table = {name: [] for name in subset.column_names}
+    contiguous = not indices or indices == list(range(indices[0], indices[0] + len(indices)))
+
+    for start in range(0, len(indices), block_size):
+        block = indices[start : start + block_size]
+        batch = subset[block[0] : block[-1] + 1] if contiguous else subset[list(block)]
+        for name, values in batch.items():
+            table[name].extend(values)
+
+    return [Row(table, i) for i in range(len(indices))]
+
 
 # -------------------- Core Class --------------------
 
 class Tester:
-    def __init__(self, predictor, data, size=DEFAULT_SIZE, workers=WORKERS, title=None):
+    def __init__(
+        self,
+        predictor,
+        data,
+        size=DEFAULT_SIZE,
+        workers=WORKERS,
+        title=None,
+        target_ci=None,
+        max_size=None,
+        seed=42,
+        output_dir=None,
+        columns=None,
+        indices=None,
+        batch_size=None,
+        sort_key=None,
+        progress=None,
+    ):
         self.predictor = predictor
         self.data = data
         self.size = size
         self.workers = workers
         self.title = title or self._make_title(predictor)
 
+        # When target_ci is set, points are drawn in random order and the run
+        # stops as soon as the 95% CI half-width of the mean error (in dollars)
+        # drops to target_ci, or after max_size points
+        self.target_ci = target_ci
+        self.max_size = max_size
+        self.seed = seed
+        self.stopped_early = False
+
+        # Headless mode: write metrics and charts to output_dir instead of fig.show()
+        self.output_dir = Path(output_dir) if output_dir else None
+
+        # The progress bar and per-point coloured errors are for interactive
+        # runs; by default they're off in headless mode so CI logs stay readable
+        self.progress = self.output_dir is None if progress is None else progress
+
+        # Dataset columns to prefetch (default: all)
+        self.columns = columns
+
+        # Explicit datapoint indices to evaluate, e.g. one shard of a larger run
+        self.requested_indices = indices
+
+        # With batch_size set, the predictor takes a list of rows and returns a
+        # list of guesses; sort_key (e.g. prompt length) groups similar rows
+        self.batch_size = batch_size
+        self.sort_key = sort_key
+
+        self.indices = []
         self.titles = []
         self.guesses = []
         self.truths = []
         self.errors = []
         self.colors = []
 
+        self.latencies = []
+        self.phases = []
+        self.spans = []
+        self.wall_time = 0.0
+        self.clock_offset = 0.0
+
     # ---------- Helpers ----------
 
     @staticmethod
@@ -64,6 +212,36 @@ class Tester:
         match = re.search(r"[-+]?\d*\.\d+|\d+", value)
         return float(match.group()) if match else 0.0
 
+    @staticmethod
+    def _truth_of(dp):
+        """Items carry a price; prompt datasets carry the price as the completion"""
+        price = getattr(dp, "price", None)
+        return price if price is not None else float(dp["completion"])
+
+    @staticmethod
+    def _title_of(dp):
+        title = getattr(dp, "title", None)
+        if title is None:
+            pieces = dp["prompt"].split("Title: ")
+            title = pieces[1].split("\n")[0] if len(pieces) > 1 else pieces[0]
+        return title
+
+    @staticmethod
+    def _ci_half_width(n, total, sq_total):
+        if n < 2:
+            return 0
+        mean = total / n
+        variance = max(sq_total / n - mean**2, 0)
+        return Z_95 * math.sqrt(variance) / math.sqrt(n)
+
+    @staticmethod
+    def _decimate(n, limit):
+        """Evenly spaced indices into range(n), always keeping the last one"""
+        if n <= limit:
+            return list(range(n))
+        step = (n - 1) / (limit - 1)
+        return sorted({round(i * step) for i in range(limit)})
+
     @staticmethod
     def _color_for(error, truth):
         if error < 40 or error / truth < 0.2:
@@ -74,21 +252,30 @@ class Tester:
 
     # ---------- Single datapoint ----------
 
-    def _run_point(self, idx):
-        dp = self.data[idx]
+    def _run_point(self, dp):
+        value, span, phases = timed_call(self.predictor, dp)
+        return self._score(dp, value, span, phases)
+
+    def _run_batch(self, rows):
+        # Every row in a batch shares the batch's span and phase timings
+        values, span, phases = timed_call(self.predictor, rows)
+        return [self._score(dp, value, span, phases) for dp, value in zip(rows, values)]
 
-        guess = self._post_process(self.predictor(dp))
-        truth = dp.price
+    def _score(self, dp, value, span, phases):
+        guess = self._post_process(value)
+        truth = self._truth_of(dp)
         error = abs(guess - truth)
 
-        title = dp.title[:40] + "..." if len(dp.title) > 40 else dp.title
+        title = self._title_of(dp)
+        title = title[:40] + "..." if len(title) > 40 else title
         color = self._color_for(error, truth)
 
-        return title, guess, truth, error, color
+        return title, guess, truth, error, color, span, phases
 
     # ---------- Charts ----------
 
     def _scatter_chart(self, title):
+        n = len(self.errors)
         df = pd.DataFrame(
             {
                 "truth": self.truths,
@@ -106,6 +293,10 @@ class Tester:
 
         max_val = float(max(df.truth.max(), df.guess.max()))
 
+        if n > MAX_SCATTER_POINTS:
+            df = df.sample(n=MAX_SCATTER_POINTS, random_state=self.seed)
+            title += f" <i>(showing {MAX_SCATTER_POINTS:,} of {n:,})</i>"
+
         fig = px.scatter(
             df,
             x="truth",
@@ -116,6 +307,7 @@ class Tester:
             title=title,
             width=1000,
             height=800,
+            render_mode="webgl" if len(df) > WEBGL_THRESHOLD else "auto",
         )
 
         for trace in fig.data:
@@ -138,7 +330,7 @@ class Tester:
         fig.update_xaxes(range=[0, max_val])
         fig.update_yaxes(range=[0, max_val])
         fig.update_layout(showlegend=False)
-        fig.show()
+        return fig
 
     def _error_trend_chart(self):
         n = len(self.errors)
@@ -148,12 +340,14 @@ class Tester:
         means = [s / i for s, i in zip(sums, x)]
 
         sq_sums = list(accumulate(e * e for e in self.errors))
-        stds = [
-            math.sqrt((sq / i) - mean**2) if i > 1 else 0
-            for i, sq, mean in zip(x, sq_sums, means)
-        ]
+        ci = [self._ci_half_width(i, s, sq) for i, s, sq in zip(x, sums, sq_sums)]
+        title = f"{self.title} Error: ${means[-1]:,.2f} ± ${ci[-1]:,.2f}"
+
+        keep = self._decimate(n, MAX_TREND_POINTS)
+        x = [x[i] for i in keep]
+        means = [means[i] for i in keep]
+        ci = [ci[i] for i in keep]
 
-        ci = [1.96 * (sd / math.sqrt(i)) if i > 1 else 0 for i, sd in zip(x, stds)]
         upper = [m + c for m, c in zip(means, ci)]
         lower = [m - c for m, c in zip(means, ci)]
 
@@ -186,7 +380,7 @@ class Tester:
         )
 
         fig.update_layout(
-            title=f"{self.title} Error: ${means[-1]:,.2f} ± ${ci[-1]:,.2f}",
+            title=title,
             xaxis_title="Datapoints",
             yaxis_title="Average Absolute Error ($)",
             width=1000,
@@ -195,44 +389,407 @@ class Tester:
             showlegend=False,
         )
 
-        fig.show()
+        return fig
 
     # ---------- Reporting ----------
 
+    @property
+    def effective_size(self):
+        return len(self.errors)
+
+    def latency_metrics(self):
+        n = self.effective_size
+        summary = latency_summary(self.latencies)
+        summary["predictions_per_sec"] = n / self.wall_time if self.wall_time else 0.0
+        # Little's law: average number of predictions in flight over the run
+        summary["mean_concurrency"] = sum(self.latencies) / self.wall_time if self.wall_time else 0.0
+        summary["peak_concurrency"] = peak_concurrency(self.spans)
+        summary["wall_time"] = self.wall_time
+
+        names = sorted({name for phases in self.phases for name in phases})
+        summary["phases"] = {
+            name: latency_summary([phases.get(name, 0.0) for phases in self.phases])
+            for name in names
+        }
+        return summary
+
+    def metrics(self):
+        n = self.effective_size
+        total = sum(self.errors)
+        sq_total = sum(e * e for e in self.errors)
+        mse = float(mean_squared_error(self.truths, self.guesses))
+
+        return {
+            "title": self.title,
+            "size": n,
+            "requested_size": self.max_size if self.target_ci is not None else self.size,
+            "target_ci": self.target_ci,
+            "stopped_early": self.stopped_early,
+            "avg_error": total / n,
+            "ci_95": self._ci_half_width(n, total, sq_total),
+            "mse": mse,
+            "rmse": math.sqrt(mse),
+            "r2": float(r2_score(self.truths, self.guesses)),
+            "colors": {c: self.colors.count(c) for c in COLOR_MAP},
+            "latency": self.latency_metrics(),
+        }
+
+    def _emit(self, fig, name):
+        if self.output_dir is None:
+            fig.show()
+            return
+
+        fig.write_html(self.output_dir / f"{name}.html", include_plotlyjs="cdn")
+        try:
+            fig.write_image(self.output_dir / f"{name}.png")
+        except (ValueError, ImportError, RuntimeError) as e:
+            # Static export needs kaleido (plotly 6+ raises RuntimeError without
+            # it); the HTML artifact is still written
+            print(f"Skipping {name}.png: {e}")
+
     def _report(self):
-        avg_error = sum(self.errors) / self.size
-        mse = mean_squared_error(self.truths, self.guesses)
-        r2 = r2_score(self.truths, self.guesses) * 100
+        metrics = self.metrics()
 
         title = (
             f"{self.title} results<br>"
-            f"<b>Error:</b> ${avg_error:,.2f} "
-            f"<b>MSE:</b> {mse:,.0f} "
-            f"<b>r²:</b> {r2:.1f}%"
+            f"<b>Error:</b> ${metrics['avg_error']:,.2f} "
+            f"<b>MSE:</b> {metrics['mse']:,.0f} "
+            f"<b>r²:</b> {metrics['r2'] * 100:.1f}% "
+            f"<b>n:</b> {metrics['size']}"
         )
 
-        self._error_trend_chart()
-        self._scatter_chart(title)
+        if self.target_ci is not None:
+            reason = "CI target reached" if self.stopped_early else "max size reached"
+            print(f"\n{self.title}: stopped after {self.effective_size} points ({reason})")
+
+        self._print_latency(metrics["latency"])
+
+        if self.output_dir is not None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with (self.output_dir / "metrics.json").open("w") as f:
+                json.dump(metrics, f, indent=2)
+
+        self._emit(self._error_trend_chart(), "error_trend")
+        self._emit(self._scatter_chart(title), "scatter")
+
+        if self.output_dir is not None:
+            print(f"\nWrote metrics and charts to {self.output_dir}")
+
+    @staticmethod
+    def _print_latency(latency):
+        print(
+            f"\nLatency p50={latency['p50'] * 1000:,.0f}ms "
+            f"p95={latency['p95'] * 1000:,.0f}ms "
+            f"p99={latency['p99'] * 1000:,.0f}ms | "
+            f"{latency['predictions_per_sec']:,.2f} predictions/sec | "
+            f"concurrency mean={latency['mean_concurrency']:.1f} peak={latency['peak_concurrency']}"
+        )
+        for name, stats in latency["phases"].items():
+            print(f"  {name}: mean={stats['mean'] * 1000:,.1f}ms p95={stats['p95'] * 1000:,.1f}ms")
 
     # ---------- Run ----------
 
-    def run(self):
+    def _indices(self):
+        """
+        (indices in evaluation order, how many there are). Sequential runs draw
+        a seeded random order lazily, since they usually stop long before max_size
+        """
+        if self.requested_indices is not None:
+            indices = list(self.requested_indices)
+            return indices, len(indices)
+        if self.target_ci is None:
+            return range(self.size), self.size
+        limit = min(self.max_size or len(self.data), len(self.data))
+        return self._random_order(limit), limit
+
+    def _random_order(self, limit):
+        """
+        limit distinct indices of the data in random order, without building
+        the whole permutation: rejection sampling while most indices are still
+        unseen, then a shuffle of whatever is left
+        """
+        rng = random.Random(self.seed)
+        total = len(self.data)
+        seen = set()
+        while len(seen) < min(limit, total // 2):
+            i = rng.randrange(total)
+            if i not in seen:
+                seen.add(i)
+                yield i
+        if len(seen) == limit:
+            return
+        rest = [i for i in range(total) if i not in seen]
+        rng.shuffle(rest)
+        yield from rest[: limit - len(seen)]
+
+    def _rows(self, indices, drawn):
+        """
+        Prefetch rows one block at a time as they are consumed, appending each
+        block's indices to drawn, so an early stop never reads the rest
+        """
+        indices = iter(indices)
+        while block := list(islice(indices, PREFETCH_BLOCK)):
+            drawn.extend(block)
+            yield from prefetch(self.data, block, self.columns)
+
+    def _stream(self, rows):
+        """
+        Yield results in order while keeping only a small window of points in flight,
+        so that stopping early doesn't pay for predictions that were never needed
+        """
+        window = self.workers * 2
+        pending = deque()
+        remaining = iter(rows)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                for row in remaining:
+                    pending.append(pool.submit(self._run_point, row))
+                    if len(pending) >= window:
+                        break
+                while pending:
+                    yield pending.popleft().result()
+                    for row in remaining:
+                        pending.append(pool.submit(self._run_point, row))
+                        break
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _stream_batches(self, rows):
+        """
+        Yield results in order for a batched predictor. Each window of rows is
+        sorted by sort_key, cut into batches that run on the pool, and mapped
+        back to the original order before anything is yielded
+        """
+        window = self.batch_size * SORT_WINDOW_BATCHES
+        rows = iter(rows)
+
         with ThreadPoolExecutor(max_workers=self.workers) as pool:
-            for title, guess, truth, error, color in tqdm(
-                pool.map(self._run_point, range(self.size)),
-                total=self.size,
-            ):
-                self.titles.append(title)
-                self.guesses.append(guess)
-                self.truths.append(truth)
-                self.errors.append(error)
-                self.colors.append(color)
+            while chunk := list(islice(rows, window)):
+                order = list(range(len(chunk)))
+                if self.sort_key is not None:
+                    order.sort(key=lambda i: self.sort_key(chunk[i]))
+
+                batches = [order[i : i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+                scored = pool.map(lambda batch: self._run_batch([chunk[i] for i in batch]), batches)
+
+                results = [None] * len(chunk)
+                for batch, batch_results in zip(batches, scored):
+                    for i, result in zip(batch, batch_results):
+                        results[i] = result
+                yield from results
+
+    def _ci_reached(self, total, sq_total):
+        n = self.effective_size
+        if self.target_ci is None or n < MIN_SEQUENTIAL_SIZE:
+            return False
+        return self._ci_half_width(n, total, sq_total) <= self.target_ci
+
+    def collect(self):
+        """Run the predictor over the datapoints without reporting"""
+        indices, expected = self._indices()
+        drawn = []
+        rows = self._rows(indices, drawn)
+        total = sq_total = 0.0
+        started = time.perf_counter()
+        self.clock_offset = time.time() - started
+
+        results = self._stream_batches(rows) if self.batch_size else self._stream(rows)
+        # Results come back in row order, and a row's block is drawn before it runs
+        for n, (title, guess, truth, error, color, span, phases) in enumerate(
+            tqdm(results, total=expected, disable=not self.progress)
+        ):
+            self.indices.append(drawn[n])
+            self.titles.append(title)
+            self.guesses.append(guess)
+            self.truths.append(truth)
+            self.errors.append(error)
+            self.colors.append(color)
+            self.latencies.append(span[1] - span[0])
+            self.spans.append(span)
+            self.phases.append(phases)
+            if self.progress:
                 print(f"{COLOR_MAP[color]}${error:.0f} ", end="")
 
+            total += error
+            sq_total += error * error
+            if self._ci_reached(total, sq_total):
+                self.stopped_early = True
+                break
+        results.close()
+        self.wall_time = time.perf_counter() - started
+
+    def run(self):
+        self.collect()
         self._report()
 
+    # ---------- Partial results ----------
+
+    def to_partial(self):
+        """Per-point results in a JSON-serialisable form, with spans on the wall clock"""
+        return {
+            "title": self.title,
+            "wall_time": self.wall_time,
+            "points": [
+                {
+                    "index": idx,
+                    "title": title,
+                    "guess": guess,
+                    "truth": truth,
+                    "error": error,
+                    "color": color,
+                    "span": [span[0] + self.clock_offset, span[1] + self.clock_offset],
+                    "phases": phases,
+                }
+                for idx, title, guess, truth, error, color, span, phases in zip(
+                    self.indices,
+                    self.titles,
+                    self.guesses,
+                    self.truths,
+                    self.errors,
+                    self.colors,
+                    self.spans,
+                    self.phases,
+                )
+            ],
+        }
+
+    @classmethod
+    def from_partials(cls, partials, output_dir=None):
+        """Rebuild a finished Tester from partial results, in original datapoint order"""
+        points = sorted((p for partial in partials for p in partial["points"]), key=lambda p: p["index"])
+        tester = cls(None, None, size=len(points), title=partials[0]["title"], output_dir=output_dir)
+
+        for point in points:
+            tester.indices.append(point["index"])
+            tester.titles.append(point["title"])
+            tester.guesses.append(point["guess"])
+            tester.truths.append(point["truth"])
+            tester.errors.append(point["error"])
+            tester.colors.append(point["color"])
+            tester.spans.append(tuple(point["span"]))
+            tester.latencies.append(point["span"][1] - point["span"][0])
+            tester.phases.append(point["phases"])
+
+        # Shards may run side by side, so wall time is measured from the first
+        # prediction to the last one across all of them
+        if tester.spans:
+            tester.wall_time = max(end for _, end in tester.spans) - min(start for start, _ in tester.spans)
+        return tester
+
+
+# -------------------- Sharded Evaluation --------------------
+
+def shard_indices(total, num_shards, shard):
+    """The contiguous, deterministic block of range(total) owned by one shard"""
+    if not 0 <= shard < num_shards:
+        raise ValueError(f"shard must be in [0, {num_shards}), got {shard}")
+    return list(range(total * shard // num_shards, total * (shard + 1) // num_shards))
+
+
+def shard_path(output_dir, shard, num_shards):
+    return Path(output_dir) / f"shard_{shard:04d}_of_{num_shards:04d}.json"
+
+
+def run_shard(
+    predictor,
+    data,
+    shard,
+    num_shards,
+    output_dir,
+    size=None,
+    workers=WORKERS,
+    columns=None,
+    title=None,
+    batch_size=None,
+    sort_key=None,
+):
+    """
+    Evaluate one shard of the first size datapoints and write its partial results;
+    shards are independent, so they can run in separate processes or machines
+    """
+    size = len(data) if size is None else size
+    tester = Tester(
+        predictor,
+        data,
+        size=size,
+        workers=workers,
+        title=title,
+        columns=columns,
+        indices=shard_indices(size, num_shards, shard),
+        batch_size=batch_size,
+        sort_key=sort_key,
+        progress=False,
+    )
+    tester.collect()
+
+    partial = tester.to_partial()
+    partial.update(shard=shard, num_shards=num_shards, size=size)
+
+    path = shard_path(output_dir, shard, num_shards)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as f:
+        json.dump(partial, f)
+    return path
+
+
+def load_partials(shard_dir):
+    """Every shard's partial results written by run_shard, in shard order"""
+    partials = []
+    for path in sorted(Path(shard_dir).glob("shard_*_of_*.json")):
+        with path.open() as f:
+            partials.append(json.load(f))
+    if not partials:
+        raise FileNotFoundError(f"No shard results found in {shard_dir}")
+    return partials
+
+
+def merge_shards(shard_dir, output_dir=None):
+    """
+    Combine every shard's partial results into one Tester and report it.
+    The errors, charts and metrics match an unsharded run over the same datapoints
+    """
+    partials = load_partials(shard_dir)
+    num_shards = partials[0]["num_shards"]
+    if any(p["num_shards"] != num_shards or p["size"] != partials[0]["size"] for p in partials):
+        raise ValueError("Shard results come from runs with different settings")
+    missing = set(range(num_shards)) - {p["shard"] for p in partials}
+    if missing:
+        raise ValueError(f"Missing results for shards {sorted(missing)}")
+
+    tester = Tester.from_partials(partials, output_dir=output_dir)
+    tester._report()
+    return tester
+
 
 # -------------------- Public API --------------------
 
-def evaluate(predictor, data, size=DEFAULT_SIZE, workers=WORKERS):
-    Tester(predictor, data, size=size, workers=workers).run()
+def evaluate(
+    predictor,
+    data,
+    size=DEFAULT_SIZE,
+    workers=WORKERS,
+    target_ci=None,
+    max_size=None,
+    output_dir=None,
+    columns=None,
+    batch_size=None,
+    sort_key=None,
+    title=None,
+):
+    tester = Tester(
+        predictor,
+        data,
+        size=size,
+        title=title,
+        workers=workers,
+        target_ci=target_ci,
+        max_size=max_size,
+        output_dir=output_dir,
+        columns=columns,
+        batch_size=batch_size,
+        sort_key=sort_key,
+    )
+    tester.run()
+    return tester.metrics()
@@ -0,0 +1,215 @@
+import json
+import re
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from pricer.items import summary_from_prompt
+from pricer.parser import MAX_PRICE, MIN_PRICE
+
+
+# -------------------- Constants --------------------
+
+FORMAT_VERSION = 1
+
+# 2^18 buckets keep collisions rare for product text and the weights at 1 MB
+DEFAULT_FEATURES = 2**18
+DEFAULT_NGRAMS = (1, 2)
+
+TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+
+# -------------------- Features --------------------
+
+class HashedFeaturizer:
+    """
+    Word n-grams hashed with crc32 into a fixed number of buckets, so there is
+    no vocabulary to fit or ship. The top hash bit picks the sign, which keeps
+    collisions unbiased; counts are log1p-scaled and each row is L2-normalised.
+    Pure Python and numpy: the same features at training time and in the agent
+    """
+
+    def __init__(self, n_features=DEFAULT_FEATURES, ngram_range=DEFAULT_NGRAMS):
+        if n_features & (n_features - 1) or n_features > 2**31:
+            raise ValueError(f"n_features must be a power of two up to 2^31, not {n_features}")
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+
+    @property
+    def config(self):
+        return {"n_features": self.n_features, "ngram_range": list(self.ngram_range)}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config["n_features"], config["ngram_range"])
+
+    def ngrams(self, text):
+        tokens = TOKEN.findall(text.lower())
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(tokens) - n + 1):
+                yield " ".join(tokens[i : i + n])
+
+    def features(self, text):
+        """(indices, values) of one text's non-zero features"""
+        counts = {}
+        mask = self.n_features - 1
+        for gram in self.ngrams(text):
+            h = zlib.crc32(gram.encode())
+            index = h & mask
+            counts[index] = counts.get(index, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+
+        indices = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        # Colliding n-grams that cancelled out stay at zero
+        values = np.sign(values) * np.log1p(np.abs(values))
+
+        norm = np.linalg.norm(values)
+        if norm > 0:
+            values /= norm
+        return indices, values
+
+    def transform(self, texts):
+        """CSR components (indptr, indices, data) for a batch of texts"""
+        indptr = [0]
+        indices, data = [], []
+        for text in texts:
+            i, v = self.features(text)
+            indices.append(i)
+            data.append(v)
+            indptr.append(indptr[-1] + len(i))
+        return (
+            np.asarray(indptr, dtype=np.int64),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+            np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+        )
+
+
+# -------------------- Text --------------------
+
+def normalize_text(text):
+    """
+    The text the model is trained and queried on: the product description
+    without the price question or "Price is $" prefix, whitespace collapsed.
+    Summaries pass through unchanged, so training rows and agent input meet
+    the featurizer in the same form
+    """
+    return " ".join(summary_from_prompt(text or "").split())
+
+
+# -------------------- Model --------------------
+
+class FallbackPricer:
+    """
+    A linear model on log price over hashed n-grams. The artifact is a single
+    uncompressed .npz (weights, bias and the featurizer config as JSON), so
+    loading is one read and prediction needs nothing beyond numpy
+    """
+
+    def __init__(self, featurizer, weights, bias=0.0, metadata=None):
+        self.featurizer = featurizer
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.metadata = metadata or {}
+
+    @classmethod
+    def fit(cls, texts, prices, featurizer=None, alpha=1.0):
+        """Ridge regression on log1p price; scikit-learn and scipy are only needed here"""
+        from scipy.sparse import csr_matrix
+        from sklearn.linear_model import Ridge
+
+        featurizer = featurizer or HashedFeaturizer()
+        start = time.perf_counter()
+        indptr, indices, data = featurizer.transform([normalize_text(text) for text in texts])
+        X = csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, featurizer.n_features))
+        y = np.log1p(np.asarray(prices, dtype=float))
+
+        model = Ridge(alpha=alpha).fit(X, y)
+        metadata = {"rows": len(y), "alpha": alpha, "fit_seconds": time.perf_counter() - start}
+        return cls(featurizer, model.coef_, model.intercept_, metadata)
+
+    def predict_batch(self, texts):
+        indptr, indices, data = self.featurizer.transform([normalize_text(text) for text in texts])
+        rows = np.repeat(np.arange(len(texts)), np.diff(indptr))
+        log_prices = self.bias + np.bincount(rows, weights=data * self.weights[indices], minlength=len(texts))
+        return np.clip(np.expm1(log_prices), MIN_PRICE, MAX_PRICE).tolist()
+
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        config = {"format": FORMAT_VERSION, "featurizer": self.featurizer.config, "metadata": self.metadata}
+        with path.open("wb") as f:
+            np.savez(f, weights=self.weights, bias=np.float64(self.bias), config=np.array(json.dumps(config)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as artifact:
+            config = json.loads(str(artifact["config"]))
+            if config["format"] != FORMAT_VERSION:
+                raise ValueError(f"{path} is format {config['format']}, expected {FORMAT_VERSION}")
+            featurizer = HashedFeaturizer.from_config(config["featurizer"])
+            return cls(featurizer, artifact["weights"], float(artifact["bias"]), config["metadata"])
+
+
+# -------------------- Command Line --------------------
+
+if __name__ == "__main__":
+    # From the repo root:
+    #   python -m pricer.fallback fit --output models/fallback_pricer.npz
+    #   python -m pricer.fallback bench --model models/fallback_pricer.npz
+    #   python -m pricer.fallback eval --model models/fallback_pricer.npz --size 1000
+    import argparse
+
+    from datasets import load_dataset
+
+    from pricer.cascade import text_of
+    from pricer.evaluate import Tester, evaluate, prefetch
+
+    parser = argparse.ArgumentParser(description="Train, time or evaluate the CPU fallback price model")
+    parser.add_argument("command", choices=["fit", "bench", "eval"])
+    parser.add_argument("--dataset", default="ed-donner/items_prompts_lite")
+    parser.add_argument("--model", default="models/fallback_pricer.npz")
+    parser.add_argument("--output", default=None, help="fit: where to save the model (default: --model)")
+    parser.add_argument("--max-train", type=int, default=None)
+    parser.add_argument("--features", type=int, default=DEFAULT_FEATURES)
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--output-dir", default=None)
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        train = load_dataset(args.dataset, split="train")
+        if args.max_train:
+            train = train.select(range(min(args.max_train, len(train))))
+        rows = prefetch(train, range(len(train)))
+        model = FallbackPricer.fit(
+            [text_of(row) for row in rows],
+            [Tester._truth_of(row) for row in rows],
+            HashedFeaturizer(args.features),
+            args.alpha,
+        )
+        model.save(args.output or args.model)
+        print(f"Fitted on {len(rows):,} items in {model.metadata['fit_seconds']:.1f}s -> {args.output or args.model}")
+    else:
+        start = time.perf_counter()
+        model = FallbackPricer.load(args.model)
+        load_ms = (time.perf_counter() - start) * 1000
+        test = load_dataset(args.dataset, split="test")
+
+        if args.command == "bench":
+            size = min(args.size, len(test))
+            texts = [text_of(row) for row in prefetch(test, range(size))]
+            start = time.perf_counter()
+            model.predict_batch(texts)
+            seconds = time.perf_counter() - start
+            print(f"Loaded in {load_ms:.1f}ms; {size:,} items in {seconds:.3f}s ({size / seconds:,.0f} items/sec)")
+        else:
+            def fallback_pricer(rows):
+                return model.predict_batch([text_of(row) for row in rows])
+
+            evaluate(fallback_pricer, test, size=args.size, workers=1, output_dir=args.output_dir, batch_size=256)
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import pickle
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from pricer.items import record_field
+
+
+# -------------------- Constants --------------------
+
+DEFAULT_ROOT = "feature_cache"
+FORMAT_VERSION = 1
+FIT_SPLIT = "train"
+
+# The TF-IDF settings shared by the traditional-ML notebooks
+NOTEBOOK_TFIDF = {"max_features": 2000, "stop_words": "english", "ngram_range": [1, 2], "sublinear_tf": True}
+
+COMPONENTS = ("data", "indices", "indptr", "y")
+
+
+class FeatureStoreError(Exception):
+    pass
+
+
+# -------------------- Featurizers --------------------
+
+def make_featurizer(kind, params):
+    """A fresh featurizer; tfidf and count are fitted on the train split, hashed is stateless"""
+    if kind == "hashed":
+        from pricer.fallback import HashedFeaturizer
+
+        return HashedFeaturizer(**params)
+
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+    vectorizers = {"tfidf": TfidfVectorizer, "count": CountVectorizer}
+    if kind not in vectorizers:
+        raise FeatureStoreError(f"Unknown featurizer {kind!r}; expected hashed, tfidf or count")
+    params = {key: tuple(value) if isinstance(value, list) else value for key, value in params.items()}
+    return vectorizers[kind](**params)
+
+
+# -------------------- Store --------------------
+
+class FeatureStore:
+    """
+    Sparse feature matrices and price vectors built once per (split,
+    featurizer config) and kept on disk as plain .npy CSR components, which
+    reload memory-mapped in milliseconds from any notebook or process.
+
+    Layout: root/<config key>/config.json, vectorizer.pkl for fitted
+    featurizers, and one directory per split with data/indices/indptr/y.npy
+    and meta.json. A split is rebuilt when the items passed in no longer match
+    the fingerprint it was built from
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, featurizer="tfidf", text="summary", dataset=None, **params):
+        if featurizer in ("tfidf", "count") and not params:
+            params = dict(NOTEBOOK_TFIDF)
+        self.config = {
+            "format": FORMAT_VERSION,
+            "dataset": dataset,
+            "text": text,
+            "featurizer": featurizer,
+            "params": params,
+        }
+        self.key = hashlib.sha256(json.dumps(self.config, sort_keys=True).encode()).hexdigest()[:16]
+        self.path = Path(root) / self.key
+        self._featurizer = None
+
+    @property
+    def stateless(self):
+        return self.config["featurizer"] == "hashed"
+
+    # ---------- Items ----------
+
+    def texts(self, items):
+        return [record_field(item, self.config["text"]) or "" for item in items]
+
+    @staticmethod
+    def prices(items):
+        return np.asarray([float(record_field(item, "price")) for item in items], dtype=np.float64)
+
+    def fingerprint(self, items):
+        """sha256 over the text and price of every item, in order"""
+        digest = hashlib.sha256()
+        for text, price in zip(self.texts(items), self.prices(items)):
+            digest.update(text.encode())
+            digest.update(np.float64(price).tobytes())
+        return digest.hexdigest()
+
+    # ---------- Featurizer ----------
+
+    @property
+    def featurizer(self):
+        """The featurizer the cached matrices were built with, for transforming new items"""
+        if self._featurizer is None:
+            if self.stateless:
+                self._featurizer = make_featurizer(self.config["featurizer"], self.config["params"])
+            else:
+                path = self.path / "vectorizer.pkl"
+                if not path.exists():
+                    raise FeatureStoreError(f"No fitted featurizer in {self.path}; build the {FIT_SPLIT} split first")
+                with path.open("rb") as f:
+                    self._featurizer = pickle.load(f)
+        return self._featurizer
+
+    def transform(self, texts):
+        if self.stateless:
+            indptr, indices, data = self.featurizer.transform(texts)
+            return csr_matrix((data, indices, indptr), shape=(len(texts), self.featurizer.n_features))
+        return self.featurizer.transform(texts)
+
+    # ---------- Build & Load ----------
+
+    def _split_dir(self, split):
+        return self.path / split
+
+    def _meta(self, split):
+        path = self._split_dir(split) / "meta.json"
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def build(self, split, items):
+        """Featurizes items and writes the split's components; fits the featurizer on the train split"""
+        start = time.perf_counter()
+        texts = self.texts(items)
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / "config.json").write_text(json.dumps(self.config, indent=2))
+
+        if not self.stateless and split == FIT_SPLIT:
+            # A refit vocabulary invalidates every split built with the old one
+            for stale in self.path.iterdir():
+                if stale.is_dir():
+                    shutil.rmtree(stale)
+            vectorizer = make_featurizer(self.config["featurizer"], self.config["params"])
+            X = vectorizer.fit_transform(texts)
+            with (self.path / "vectorizer.pkl").open("wb") as f:
+                pickle.dump(vectorizer, f)
+            self._featurizer = vectorizer
+        else:
+            X = self.transform(texts)
+        X = csr_matrix(X)
+        X.sort_indices()
+
+        staging = self._split_dir(split).with_name(split + ".partial")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+        components = {"data": X.data, "indices": X.indices, "indptr": X.indptr, "y": self.prices(items)}
+        for name, array in components.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+
+        meta = {
+            "split": split,
+            "shape": list(X.shape),
+            "nnz": int(X.nnz),
+            "fingerprint": self.fingerprint(items),
+            "build_seconds": time.perf_counter() - start,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        (staging / "meta.json").write_text(json.dumps(meta, indent=2))
+
+        target = self._split_dir(split)
+        if target.exists():
+            shutil.rmtree(target)
+        staging.rename(target)
+        print(f"Built {split} features {X.shape[0]:,} x {X.shape[1]:,} ({X.nnz:,} non-zeros) in {meta['build_seconds']:.1f}s")
+        return meta
+
+    def load(self, split, mmap=True):
+        """(X, y) from the cache; components are memory-mapped read-only unless mmap is False"""
+        meta = self._meta(split)
+        if meta is None:
+            raise FeatureStoreError(f"No cached {split} features in {self.path}")
+        split_dir = self._split_dir(split)
+        arrays = {name: np.load(split_dir / f"{name}.npy", mmap_mode="r" if mmap else None) for name in COMPONENTS}
+        X = csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(meta["shape"]), copy=False)
+        return X, arrays["y"]
+
+    def get(self, split, items=None):
+        """
+        (X, y) for a split, built on the first call. With items, a cache built
+        from different items is rebuilt; without, whatever is cached is trusted
+        """
+        meta = self._meta(split)
+        if items is not None and (meta is None or meta["fingerprint"] != self.fingerprint(items)):
+            self.build(split, items)
+        elif meta is None:
+            raise FeatureStoreError(f"No cached {split} features in {self.path}; pass the items to build them")
+        return self.load(split)
+
+
+# -------------------- Command Line --------------------
+
+if __name__ == "__main__":
+    # From the repo root, build every split once:
+    #   python -m pricer.features --dataset ed-donner/items_lite
+    #   python -m pricer.features --dataset ed-donner/items_lite --featurizer hashed
+    # Then in a notebook:
+    #   store = FeatureStore(featurizer="tfidf", dataset="ed-donner/items_lite")
+    #   X_train, y_train = store.get("train")
+    import argparse
+
+    from pricer.items import Item
+
+    parser = argparse.ArgumentParser(description="Build cached feature matrices for the ML experiments")
+    parser.add_argument("--dataset", default="ed-donner/items_lite")
+    parser.add_argument("--featurizer", choices=["tfidf", "count", "hashed"], default="tfidf")
+    parser.add_argument("--text", default="summary", help="Item field to featurize")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    store = FeatureStore(args.root, args.featurizer, args.text, args.dataset)
+    splits = dict(zip(("train", "validation", "test"), Item.get_from_hub(args.dataset)))
+    for split, items in splits.items():
+        store.get(split, items)
+
+    for split in splits:
+        start = time.perf_counter()
+        X, y = store.load(split)
+        print(f"{split}: {X.shape[0]:,} x {X.shape[1]:,} reloaded in {(time.perf_counter() - start) * 1000:.1f}ms")
+    print(f"Features cached in {store.path}")
@@ -1,10 +1,22 @@
 from pydantic import BaseModel
-from datasets import Dataset, DatasetDict , load_dataset
 from typing import Optional , Self, List
 
 PREFIX="Price is $"
 QUESTION="What is the price of the product, rounded to the nearest dollar?"
 
+
+def summary_from_prompt(prompt: str) -> str:
+    """The product text inside a prompt, without the question or the price"""
+    return prompt.replace(QUESTION, "").split(PREFIX)[0].strip()
+
+
+def record_field(record, key):
+    """A field of a dict (dataset or Parquet row) or an attribute of an Item or harness Row; None if absent"""
+    if isinstance(record, dict):
+        return record.get(key)
+    return getattr(record, key, None)
+
+
 class Item(BaseModel):
     title: str
     category:str
@@ -50,6 +62,9 @@ class Item(BaseModel):
 
     @staticmethod
     def push_to_hub(dataset_name:str, train:List[Self], val:List[Self], test:List[Self]):
+        # datasets is only needed here and in get_from_hub, not to use Items
+        from datasets import Dataset, DatasetDict
+
         DatasetDict(
             {
                 "train":Dataset.from_list([item.model_dump() for item in train]),
@@ -60,6 +75,8 @@ class Item(BaseModel):
 
     @classmethod
     def get_from_hub(cls , dataset_name:str)->tuple[List[Self], List[Self], List[Self]]:
+        from datasets import load_dataset
+
         dataset = load_dataset(dataset_name)
         return (
             [cls.model_validate(train_row) for train_row in dataset['train']],
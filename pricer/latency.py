@@ -0,0 +1,66 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+# -------------------- Percentiles --------------------
+
+# One definition of p50/p95/p99 for the evaluation harness, the serving stats
+# and the training callbacks, so their numbers can be compared directly.
+# No third-party imports: the serving image loads this without the harness
+
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, q):
+    """Linearly interpolated percentile, the same as numpy's default; 0.0 for no values"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    pos = (len(ordered) - 1) * q / 100
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def latency_summary(latencies):
+    summary = {f"p{q}": percentile(latencies, q) for q in LATENCY_PERCENTILES}
+    summary["mean"] = sum(latencies) / len(latencies) if latencies else 0.0
+    return summary
+
+
+# -------------------- Phases --------------------
+
+_timing = threading.local()
+
+
+@contextmanager
+def phase(name):
+    """
+    Time a named sub-phase of a prediction, e.g. `with phase("generate"): ...`
+    Inside timed_call (every Tester prediction) the duration is attached to
+    the current datapoint; outside of one this is a no-op
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = getattr(_timing, "phases", None)
+        if phases is not None:
+            phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def timed_call(predictor, arg):
+    """
+    predictor(arg) timed as one datapoint (or batch): returns the value, its
+    (start, end) span on perf_counter and the seconds of each phase() inside it
+    """
+    _timing.phases = {}
+    start = time.perf_counter()
+    try:
+        value = predictor(arg)
+    finally:
+        end = time.perf_counter()
+        phases, _timing.phases = _timing.phases, None
+    return value, (start, end), phases
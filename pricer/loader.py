@@ -1,6 +1,7 @@
 from datetime import datetime
 from tqdm import tqdm
 from datasets import load_dataset
+from collections import deque
 from concurrent.futures import ProcessPoolExecutor
 from pricer.parser import parse
 import os
@@ -50,19 +51,43 @@ class ItemLoader:
                 results.extend(batch)
         return results
 
-    def load(self, workers=WORKERS):
+    def open(self):
         """
-        Load in this dataset; the workers parameter specifies how many processes
-        should work on loading and scrubbing the data
+        Load the raw Dataset for this category; it is memory-mapped Arrow, so
+        this doesn't read the whole category into memory
         """
-        start = datetime.now()
-        print(f"Loading dataset {self.category}", flush=True)
         self.dataset = load_dataset(
             "McAuley-Lab/Amazon-Reviews-2023",
             f"raw_meta_{self.category}",
             split="full",
             trust_remote_code=True,
         )
+
+    def stream(self, workers=WORKERS):
+        """
+        Yield Items one at a time instead of collecting them in a list -
+        at most 2 chunks per worker are in flight, so memory stays flat however
+        big the category is
+        """
+        if self.dataset is None:
+            self.open()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in self.chunk_generator():
+                pending.append(pool.submit(self.from_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def load(self, workers=WORKERS):
+        """
+        Load in this dataset; the workers parameter specifies how many processes
+        should work on loading and scrubbing the data
+        """
+        start = datetime.now()
+        print(f"Loading dataset {self.category}", flush=True)
+        self.open()
         results = self.load_in_parallel(workers)
         finish = datetime.now()
         print(
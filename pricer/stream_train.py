@@ -0,0 +1,293 @@
+import random
+import time
+import zlib
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.linear_model import SGDRegressor
+
+from pricer.fallback import FallbackPricer, HashedFeaturizer
+from pricer.items import record_field, summary_from_prompt
+from pricer.parser import MAX_PRICE, MIN_PRICE
+
+
+# -------------------- Constants --------------------
+
+BATCH_SIZE = 1024
+SHUFFLE_BUFFER = 16_384
+PARQUET_COLUMNS = ("title", "summary", "description", "prompt", "completion", "price")
+
+# About one record in HOLDOUT_EVERY, picked by a hash of its text, is kept out
+# of training; a sample of EVAL_SIZE of them is scored at the end with the same
+# text as training
+HOLDOUT_EVERY = 20
+EVAL_SIZE = 2_000
+
+
+# -------------------- Records --------------------
+
+def item_text(record):
+    """
+    The text to featurize for an Item, a harness Row or a Parquet row: the
+    summary if there is one, the prompt without its question and price, or
+    the raw description straight from the loader
+    """
+    summary = record_field(record, "summary")
+    if summary:
+        return summary
+    if record_field(record, "prompt"):
+        return summary_from_prompt(record_field(record, "prompt"))
+    return record_field(record, "description") or record_field(record, "title") or ""
+
+
+def item_price(record):
+    price = record_field(record, "price")
+    if price is None and record_field(record, "completion"):
+        price = float(record_field(record, "completion"))
+    return price
+
+
+# -------------------- Sources --------------------
+
+def loader_source(categories, workers=None):
+    """
+    Items for each category straight from ItemLoader.stream, one category
+    after another; nothing is collected, so adding categories adds time, not memory
+    """
+    from pricer.loader import WORKERS, ItemLoader
+
+    def records():
+        return chain.from_iterable(ItemLoader(category).stream(workers or WORKERS) for category in categories)
+
+    return records
+
+
+def parquet_source(paths, read_batch_size=BATCH_SIZE):
+    """Rows from Parquet shards, read one record batch at a time"""
+    import pyarrow.parquet as pq
+
+    paths = sorted(str(path) for path in paths)
+    if not paths:
+        raise FileNotFoundError("No Parquet shards given")
+
+    def records():
+        for path in paths:
+            shard = pq.ParquetFile(path)
+            columns = [name for name in PARQUET_COLUMNS if name in shard.schema_arrow.names]
+            for batch in shard.iter_batches(batch_size=read_batch_size, columns=columns):
+                yield from batch.to_pylist()
+
+    return records
+
+
+def is_holdout(record, every):
+    """Decided by the record's text rather than its position, so it is the same on every epoch and run"""
+    return bool(every) and zlib.crc32(item_text(record).encode()) % every == 0
+
+
+def split_holdout(records, every, limit, holdout=None, seed=42):
+    """
+    Yields the records that aren't held out. The held-out ones come from the
+    whole stream, every category included, and when holdout is given it
+    receives a uniform sample of at most limit of them (reservoir sampling)
+    """
+    rng = random.Random(seed)
+    held = 0
+    for record in records:
+        if not is_holdout(record, every):
+            yield record
+            continue
+        if holdout is None:
+            continue
+        held += 1
+        if len(holdout) < limit:
+            holdout.append(record)
+        elif (slot := rng.randrange(held)) < limit:
+            holdout[slot] = record
+
+
+def shuffled_batches(records, batch_size=BATCH_SIZE, buffer_size=SHUFFLE_BUFFER, seed=42):
+    """
+    Mini-batches from a bounded shuffle buffer. SGD needs the categories
+    mixed rather than one after another, and the buffer caps how many records
+    are held at once
+    """
+    rng = random.Random(seed)
+    buffer = []
+
+    def drain():
+        rng.shuffle(buffer)
+        for i in range(0, len(buffer), batch_size):
+            yield buffer[i : i + batch_size]
+        buffer.clear()
+
+    for record in records:
+        buffer.append(record)
+        if len(buffer) >= buffer_size:
+            yield from drain()
+    yield from drain()
+
+
+# -------------------- Trainer --------------------
+
+class StreamTrainer:
+    """
+    SGDRegressor on log1p price, fitted one mini-batch at a time over the
+    stateless hashed features from pricer.fallback. Memory is the shuffle
+    buffer, the held-out records and the weight vector whatever the size of
+    the stream, and the result saves as a FallbackPricer artifact
+    """
+
+    def __init__(
+        self,
+        featurizer=None,
+        batch_size=BATCH_SIZE,
+        buffer_size=SHUFFLE_BUFFER,
+        alpha=1e-6,
+        eta0=0.01,
+        seed=42,
+    ):
+        self.featurizer = featurizer or HashedFeaturizer()
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.seed = seed
+        self.model = SGDRegressor(
+            loss="squared_error",
+            penalty="l2",
+            alpha=alpha,
+            learning_rate="invscaling",
+            eta0=eta0,
+            random_state=seed,
+        )
+        self.rows = 0
+        self.skipped = 0
+        self.seconds = 0.0
+        self.holdout = []
+
+    def partial_fit(self, records):
+        texts, targets = [], []
+        for record in records:
+            price = item_price(record)
+            if price is None or not MIN_PRICE <= price <= MAX_PRICE:
+                self.skipped += 1
+                continue
+            texts.append(item_text(record))
+            targets.append(np.log1p(price))
+        if not texts:
+            return
+
+        indptr, indices, data = self.featurizer.transform(texts)
+        X = csr_matrix((data, indices, indptr), shape=(len(texts), self.featurizer.n_features))
+        self.model.partial_fit(X, np.asarray(targets))
+        self.rows += len(texts)
+
+    def fit(self, source, epochs=1, holdout_every=HOLDOUT_EVERY, eval_size=EVAL_SIZE, report_every=50):
+        """
+        source() returns a fresh iterable of records for each epoch. About one
+        in holdout_every is never trained on, and up to eval_size of those are
+        sampled into self.holdout
+        """
+        start = time.perf_counter()
+        self.holdout = []
+        for epoch in range(epochs):
+            records = split_holdout(source(), holdout_every, eval_size, self.holdout if epoch == 0 else None, self.seed)
+            batches = shuffled_batches(records, self.batch_size, self.buffer_size, self.seed + epoch)
+            for i, batch in enumerate(batches, 1):
+                self.partial_fit(batch)
+                if i % report_every == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"Epoch {epoch + 1}: {self.rows:,} rows, {self.rows / elapsed:,.0f} rows/sec", flush=True)
+        self.seconds += time.perf_counter() - start
+        return self
+
+    def stats(self):
+        return {
+            "rows": self.rows,
+            "skipped": self.skipped,
+            "seconds": self.seconds,
+            "rows_per_sec": self.rows / self.seconds if self.seconds else 0.0,
+        }
+
+    def holdout_rows(self):
+        """
+        The held-out records as harness rows carrying the text the model was
+        trained on, so evaluation sees the same field as training
+        """
+        from pricer.evaluate import Row
+
+        records = [record for record in self.holdout if item_price(record) is not None]
+        texts = [item_text(record) for record in records]
+        columns = {
+            "text": texts,
+            "price": [item_price(record) for record in records],
+            "title": [record_field(record, "title") or text[:60] for record, text in zip(records, texts)],
+        }
+        return [Row(columns, i) for i in range(len(records))]
+
+    def to_pricer(self):
+        return FallbackPricer(
+            self.featurizer,
+            self.model.coef_,
+            self.model.intercept_[0],
+            {**self.stats(), "trainer": "sgd", "alpha": self.model.alpha},
+        )
+
+
+# -------------------- Command Line --------------------
+
+if __name__ == "__main__":
+    # From the repo root:
+    #   python -m pricer.stream_train --categories Appliances Electronics --output models/stream_pricer.npz
+    #   python -m pricer.stream_train --parquet "data/items/*.parquet" --epochs 2
+    import argparse
+    import glob
+
+    from pricer.evaluate import evaluate
+
+    parser = argparse.ArgumentParser(description="Train the hashed-feature price model over a stream of items")
+    source_args = parser.add_mutually_exclusive_group(required=True)
+    source_args.add_argument("--categories", nargs="+", help="Amazon categories read through ItemLoader")
+    source_args.add_argument("--parquet", nargs="+", help="Parquet shards or glob patterns")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--buffer-size", type=int, default=SHUFFLE_BUFFER)
+    parser.add_argument("--alpha", type=float, default=1e-6)
+    parser.add_argument("--eta0", type=float, default=0.01)
+    parser.add_argument("--features", type=int, default=2**18)
+    parser.add_argument("--output", default="models/stream_pricer.npz")
+    parser.add_argument("--holdout-every", type=int, default=HOLDOUT_EVERY)
+    parser.add_argument("--eval-size", type=int, default=EVAL_SIZE, help="Held-out records to evaluate on")
+    parser.add_argument("--output-dir", default=None, help="Write evaluation metrics and charts here")
+    args = parser.parse_args()
+
+    if args.categories:
+        source = loader_source(args.categories, args.workers)
+    else:
+        source = parquet_source(Path(path) for pattern in args.parquet for path in glob.glob(pattern))
+
+    trainer = StreamTrainer(
+        HashedFeaturizer(args.features),
+        batch_size=args.batch_size,
+        buffer_size=args.buffer_size,
+        alpha=args.alpha,
+        eta0=args.eta0,
+    ).fit(source, epochs=args.epochs, holdout_every=args.holdout_every, eval_size=args.eval_size)
+
+    stats = trainer.stats()
+    print(
+        f"Trained on {stats['rows']:,} rows ({stats['skipped']:,} skipped) in {stats['seconds']:.1f}s: "
+        f"{stats['rows_per_sec']:,.0f} rows/sec"
+    )
+
+    model = trainer.to_pricer()
+    model.save(args.output)
+    print(f"Saved to {args.output}")
+
+    def stream_pricer(rows):
+        return model.predict_batch([row.text for row in rows])
+
+    holdout = trainer.holdout_rows()
+    evaluate(stream_pricer, holdout, size=len(holdout), workers=1, output_dir=args.output_dir, batch_size=256)
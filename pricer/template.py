@@ -0,0 +1,61 @@
+from pricer.parser import JUNK_FIELDS, clean_text, remove_product_codes
+import re
+
+# Settings – easy to change
+MAX_TITLE_CHARS = 120
+MAX_SENTENCE_CHARS = 300
+UNKNOWN = "Unknown"
+
+# Detail keys that usually hold the brand, in order of preference
+BRAND_FIELDS = ["Brand", "Brand Name", "Manufacturer"]
+
+
+# First sentence of a block of text, cleaned and capped
+def first_sentence(text) -> str:
+    text = remove_product_codes(clean_text(text))
+    text = " ".join(text.split())
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = match.group(1) if match else text
+    return sentence[:MAX_SENTENCE_CHARS]
+
+
+# Features may arrive as a list of bullets or one string
+def join_features(features) -> str:
+    if isinstance(features, (list, tuple)):
+        return "; ".join(clean_text(f) for f in features if f)
+    return clean_text(features)
+
+
+# Brand from explicit field first, then from the details dict
+def find_brand(brand, details) -> str:
+    if brand:
+        return clean_text(brand)
+    for field in BRAND_FIELDS:
+        if details.get(field):
+            return clean_text(details[field])
+    return UNKNOWN
+
+
+# Deterministic stand-in for the LLM rewrite: same 5-line format as SYSTEM_PROMPT
+def build_summary(title, category=None, brand=None, description=None, features=None, details=None) -> str:
+    details = {k: v for k, v in (details or {}).items() if k not in JUNK_FIELDS}
+
+    title = " ".join(remove_product_codes(clean_text(title)).split())[:MAX_TITLE_CHARS]
+    description = first_sentence(description) if description else first_sentence(title)
+
+    if features:
+        feature_text = first_sentence(join_features(features))
+    elif details:
+        feature_text = first_sentence(", ".join(f"{k}: {v}" for k, v in details.items()))
+    else:
+        feature_text = description
+
+    return "\n".join(
+        [
+            f"Title: {title}",
+            f"Category: {clean_text(category) or UNKNOWN}",
+            f"Brand: {find_brand(brand, details)}",
+            f"Description: {description}",
+            f"Details: {feature_text}",
+        ]
+    )
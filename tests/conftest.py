@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+# pricer is imported as a package from the repo root; the fine-tuning scripts
+# import each other as top-level modules from their own directory
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "fine-tuning-modules"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("peft")
+
+from artifact import FORMAT_VERSION, MANIFEST, ArtifactError, read_manifest
+
+
+def write_artifact(directory, files):
+    for name, content in files.items():
+        (directory / name).write_bytes(content)
+    manifest = {
+        "format": FORMAT_VERSION,
+        "device": "cpu",
+        "quantization": "none",
+        "files": {name: len(content) for name, content in files.items()},
+    }
+    (directory / MANIFEST).write_text(json.dumps(manifest))
+    return manifest
+
+
+def test_complete_artifact_reads_back(tmp_path):
+    manifest = write_artifact(tmp_path, {"model.safetensors": b"weights", "tokenizer.json": b"{}"})
+    assert read_manifest(tmp_path) == manifest
+
+
+def test_missing_manifest(tmp_path):
+    with pytest.raises(ArtifactError, match="run artifact.py prepare"):
+        read_manifest(tmp_path)
+
+
+def test_truncated_or_missing_files_are_rejected(tmp_path):
+    write_artifact(tmp_path, {"model.safetensors": b"weights", "tokenizer.json": b"{}"})
+    (tmp_path / "model.safetensors").write_bytes(b"wei")
+    with pytest.raises(ArtifactError, match="model.safetensors is missing or incomplete"):
+        read_manifest(tmp_path)
+
+    (tmp_path / "model.safetensors").unlink()
+    with pytest.raises(ArtifactError, match="missing or incomplete"):
+        read_manifest(tmp_path)
+
+
+def test_other_formats_are_rejected(tmp_path):
+    manifest = write_artifact(tmp_path, {})
+    (tmp_path / MANIFEST).write_text(json.dumps({**manifest, "format": FORMAT_VERSION + 1}))
+    with pytest.raises(ArtifactError, match="expected"):
+        read_manifest(tmp_path)
@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from batching import BatcherClosed, BatchingPredictor
+
+
+class StubPredictor:
+    """Echoes prompts back upper-cased and records the batches it was given"""
+
+    def __init__(self, release=None, fail=False):
+        self.batches = []
+        self.release = release
+        self.fail = fail
+
+    def predict_batch(self, prompts):
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        self.batches.append(list(prompts))
+        if self.fail:
+            raise ValueError("model exploded")
+        return [prompt.upper() for prompt in prompts]
+
+
+def test_concurrent_prompts_are_batched_and_answered_in_order():
+    stub = StubPredictor()
+    batcher = BatchingPredictor(stub, max_batch_size=4, max_wait=0.05)
+    prompts = [f"p{i}" for i in range(10)]
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        outputs = list(pool.map(batcher.predict, prompts))
+    batcher.close()
+
+    assert outputs == [prompt.upper() for prompt in prompts]
+    assert all(len(batch) <= 4 for batch in stub.batches)
+    assert sum(len(batch) for batch in stub.batches) == 10
+
+    stats = batcher.stats()
+    assert stats["requests"] == 10
+    assert stats["batches"] == len(stub.batches)
+    assert stats["request_time_p95"] >= stats["request_time_p50"] > 0
+
+
+def test_predictor_errors_reach_every_caller_in_the_batch():
+    batcher = BatchingPredictor(StubPredictor(fail=True), max_batch_size=4, max_wait=0.01)
+    futures = [batcher.submit("a"), batcher.submit("b")]
+    for future in futures:
+        with pytest.raises(ValueError, match="model exploded"):
+            future.result(timeout=5)
+    batcher.close()
+
+
+def test_close_finishes_queued_prompts_then_rejects_new_ones():
+    release = threading.Event()
+    batcher = BatchingPredictor(StubPredictor(release=release), max_batch_size=2, max_wait=0.0)
+    futures = [batcher.submit(f"p{i}") for i in range(5)]
+
+    closer = threading.Thread(target=batcher.close)
+    closer.start()
+    release.set()
+    closer.join(timeout=5)
+
+    assert not closer.is_alive()
+    assert [future.result(timeout=1) for future in futures] == [f"P{i}" for i in range(5)]
+    with pytest.raises(BatcherClosed):
+        batcher.submit("late")
+    batcher.close()  # a second close is a no-op
+
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("sklearn")
+
+from pricer.cascade import BaselinePricer, CascadePredictor
+
+WORDS = ["cable", "phone", "laptop", "chair", "lamp", "camera", "watch", "speaker"]
+TEXTS = [f"{WORDS[i % 8]} {WORDS[(i * 3) % 8]} model {i % 5} brand {i % 7}" for i in range(200)]
+PRICES = [5.0 + 40 * (i % 8) + (i % 5) for i in range(200)]
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    return BaselinePricer(max_features=500, folds=3).fit(TEXTS, PRICES)
+
+
+def test_saved_baseline_predicts_the_same_after_loading(baseline, tmp_path):
+    path = tmp_path / "baseline.npz"
+    baseline.save(path)
+    loaded = BaselinePricer.load(path)
+
+    prices, uncertainty = baseline.predict_with_uncertainty(TEXTS[:20])
+    loaded_prices, loaded_uncertainty = loaded.predict_with_uncertainty(TEXTS[:20])
+    assert loaded_prices == pytest.approx(prices)
+    assert loaded_uncertainty == pytest.approx(uncertainty)
+
+
+def test_cascade_escalates_only_uncertain_items(baseline):
+    sent = []
+
+    def expensive(texts):
+        sent.extend(texts)
+        return [123.0] * len(texts)
+
+    _, uncertainty = baseline.predict_with_uncertainty(TEXTS[:10])
+    threshold = sorted(uncertainty)[5]
+    cascade = CascadePredictor(baseline, expensive, threshold)
+    prices, escalated, _ = cascade.predict_batch(TEXTS[:10])
+
+    assert sent == [text for text, flag in zip(TEXTS[:10], escalated) if flag]
+    assert all(price == 123.0 for price, flag in zip(prices, escalated) if flag)
+    assert cascade.stats()["cascade_escalated"] == sum(escalated) == 4
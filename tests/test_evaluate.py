@@ -0,0 +1,75 @@
+import copy
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("plotly")
+
+from pricer.evaluate import MIN_SEQUENTIAL_SIZE, PREFETCH_BLOCK, Row, Tester
+
+
+class CountingList(list):
+    """Items that record which positions were read"""
+
+    def __init__(self, items):
+        super().__init__(items)
+        self.reads = []
+
+    def __getitem__(self, i):
+        self.reads.append(i)
+        return super().__getitem__(i)
+
+
+def items(n):
+    return CountingList(SimpleNamespace(title=f"Item {i}", price=float(i % 100 + 1)) for i in range(n))
+
+
+def test_sequential_run_only_reads_the_blocks_it_needs():
+    data = items(50_000)
+    tester = Tester(lambda item: item.price + 1, data, workers=2, target_ci=100.0)
+    tester.collect()
+
+    assert tester.stopped_early
+    assert tester.effective_size == MIN_SEQUENTIAL_SIZE
+    assert len(data.reads) == PREFETCH_BLOCK
+    assert len(set(tester.indices)) == MIN_SEQUENTIAL_SIZE
+
+
+@pytest.mark.parametrize("batch_size", [None, 8])
+def test_sequential_run_to_max_size_draws_distinct_rows(batch_size):
+    def predictor(rows):
+        # Uneven errors keep the confidence interval above the target
+        return [row.price * 2 for row in rows] if batch_size else rows.price * 2
+
+    data = items(2_500)
+    tester = Tester(predictor, data, workers=2, target_ci=1e-9, max_size=2_400, batch_size=batch_size)
+    tester.collect()
+
+    assert not tester.stopped_early
+    assert len(set(tester.indices)) == 2_400
+    assert tester.truths == [data[i].price for i in tester.indices]
+
+
+def test_random_order_is_seeded_and_covers_small_datasets():
+    tester = Tester(None, items(10), title="order", target_ci=1.0, seed=7)
+    order, limit = tester._indices()
+    assert limit == 10
+    order = list(order)
+    assert sorted(order) == list(range(10))
+    assert list(tester._indices()[0]) == order
+
+
+def test_rows_copy_and_pickle():
+    row = Row({"title": ["a", "b"], "price": [1.0, 2.0]}, 1)
+    for clone in (copy.copy(row), copy.deepcopy(row), pickle.loads(pickle.dumps(row))):
+        assert (clone.title, clone["price"]) == ("b", 2.0)
+    assert not hasattr(row, "_missing")
+    with pytest.raises(AttributeError):
+        row.color
+
+
+def test_headless_runs_print_no_per_point_colours(tmp_path, capsys):
+    Tester(lambda item: item.price + 3, items(50), size=50, workers=2, output_dir=tmp_path).collect()
+    assert "\033[" not in capsys.readouterr().out
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+from jobs import DONE, FAILED, QUEUED, RUNNING, LocalJobRunner, LockedDict, create_job, job_results, job_status, run_job
+
+
+def priced(items):
+    return [{"price": float(item["n"])} for item in items]
+
+
+def in_order(batches):
+    for index, batch in enumerate(batches):
+        yield index, priced(batch)
+
+
+def test_job_moves_from_queued_to_done():
+    store = LockedDict()
+    items = [{"n": i} for i in range(10)]
+    job_id = create_job(store, items, batch_size=4)
+
+    status = job_status(store, job_id)
+    assert status["status"] == QUEUED
+    assert (status["total"], status["batches"], status["progress"]) == (10, 3, 0.0)
+    assert job_results(store, job_id)["results"] == []
+
+    seen = []
+
+    def watched(batches):
+        for index, results in in_order(batches):
+            seen.append(store[job_id]["status"])
+            yield index, results
+
+    run_job(store, job_id, watched)
+
+    assert seen == [RUNNING] * 3
+    status = job_status(store, job_id)
+    assert status["status"] == DONE
+    assert (status["completed"], status["errors"], status["progress"]) == (10, 0, 1.0)
+    assert status["eta"] is None
+    assert [r["price"] for r in job_results(store, job_id)["results"]] == list(range(10))
+
+
+def test_results_stop_at_the_first_unfinished_batch():
+    store = LockedDict()
+    job_id = create_job(store, [{"n": i} for i in range(6)], batch_size=2)
+
+    def out_of_order(batches):
+        yield 2, priced(batches[2])
+        yield 0, priced(batches[0])
+
+    run_job(store, job_id, out_of_order)
+
+    assert [r["price"] for r in job_results(store, job_id)["results"]] == [0, 1]
+    page = job_results(store, job_id, offset=1, limit=1)
+    assert page["offset"] == 1 and page["results"] == [{"price": 1.0}]
+
+
+def test_item_errors_are_counted_and_worker_errors_fail_the_job():
+    store = LockedDict()
+    job_id = create_job(store, [{"n": i} for i in range(4)], batch_size=2)
+
+    def crashes(batches):
+        yield 0, [{"price": 1.0}, {"error": "bad item"}]
+        raise RuntimeError("container lost")
+
+    with pytest.raises(RuntimeError):
+        run_job(store, job_id, crashes)
+
+    status = job_status(store, job_id)
+    assert status["status"] == FAILED
+    assert status["error"] == "RuntimeError: container lost"
+    assert (status["completed"], status["errors"]) == (2, 1)
+    assert status["finished"] is not None
+
+
+def test_unknown_jobs():
+    store = LockedDict()
+    assert job_status(store, "missing") is None
+    assert job_results(store, "missing") is None
+
+
+def test_local_runner_finishes_in_the_background():
+    runner = LocalJobRunner(priced, workers=3, batch_size=5)
+    job_id = runner.submit([{"n": i} for i in range(23)])
+
+    deadline = time.monotonic() + 5
+    while runner.status(job_id)["status"] in (QUEUED, RUNNING) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert runner.status(job_id)["status"] == DONE
+    assert [r["price"] for r in runner.results(job_id)["results"]] == list(range(23))
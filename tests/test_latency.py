@@ -0,0 +1,22 @@
+import pytest
+
+from pricer.latency import latency_summary, percentile
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [4, 1, 3, 2]
+    assert percentile(values, 0) == 1
+    assert percentile(values, 50) == pytest.approx(2.5)
+    assert percentile(values, 95) == pytest.approx(3.85)
+    assert percentile(values, 100) == 4
+
+
+def test_percentile_of_nothing_is_zero():
+    assert percentile([], 95) == 0.0
+
+
+def test_latency_summary():
+    summary = latency_summary([0.1, 0.2, 0.3])
+    assert summary["mean"] == pytest.approx(0.2)
+    assert summary["p50"] == pytest.approx(0.2)
+    assert set(summary) == {"p50", "p95", "p99", "mean"}
@@ -0,0 +1,68 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("datasets")
+
+from packing import IGNORE_INDEX, PackedCollator, pack, padding_fraction
+
+
+def example(length, start):
+    ids = list(range(start, start + length))
+    return {"input_ids": ids, "labels": ids, "position_ids": list(range(length))}
+
+
+def test_pack_fits_every_example_once_within_max_length():
+    lengths = [7, 5, 4, 3, 3, 2, 1, 6]
+    examples = [example(n, 100 * i) for i, n in enumerate(lengths)]
+    packed = pack(examples, max_length=8)
+
+    rows = packed["input_ids"]
+    assert all(len(row) <= 8 for row in rows)
+    assert sorted(sum(rows, [])) == sorted(sum((e["input_ids"] for e in examples), []))
+    # 31 tokens need at least 4 rows of 8; best-fit-decreasing finds them
+    assert len(rows) == 4
+
+    for row, positions in zip(rows, packed["position_ids"]):
+        starts = [i for i, p in enumerate(positions) if p == 0]
+        segments = [row[a:b] for a, b in zip(starts, starts[1:] + [len(row)])]
+        assert all(segment[0] % 100 == 0 and len(segment) in lengths for segment in segments)
+
+
+def test_padding_fraction():
+    assert padding_fraction([4, 4, 2, 2], batch_size=2) == 0.0
+    assert padding_fraction([4, 2], batch_size=2) == pytest.approx(0.25)
+    assert padding_fraction([], batch_size=2) == 0.0
+
+
+def test_block_mask_keeps_examples_apart():
+    row = {"input_ids": [1, 2, 3, 4, 5], "labels": [1, 2, 3, 4, 5], "position_ids": [0, 1, 2, 0, 1]}
+    short = {"input_ids": [6, 7], "labels": [IGNORE_INDEX, 7], "position_ids": [0, 1]}
+    batch = PackedCollator(pad_token_id=0)([row, short])
+
+    assert batch["input_ids"].tolist() == [[1, 2, 3, 4, 5], [6, 7, 0, 0, 0]]
+    assert batch["labels"][1].tolist() == [IGNORE_INDEX, 7, IGNORE_INDEX, IGNORE_INDEX, IGNORE_INDEX]
+
+    allowed = (batch["attention_mask"][:, 0] == 0).int().tolist()
+    assert allowed[0] == [
+        [1, 0, 0, 0, 0],
+        [1, 1, 0, 0, 0],
+        [1, 1, 1, 0, 0],
+        [0, 0, 0, 1, 0],
+        [0, 0, 0, 1, 1],
+    ]
+    # Padding only attends to itself
+    assert allowed[1] == [
+        [1, 0, 0, 0, 0],
+        [1, 1, 0, 0, 0],
+        [0, 0, 1, 0, 0],
+        [0, 0, 0, 1, 0],
+        [0, 0, 0, 0, 1],
+    ]
+
+
+def test_flash_attention_batches_are_flattened():
+    rows = [example(3, 10), example(2, 20)]
+    batch = PackedCollator(pad_token_id=0, attn_implementation="flash_attention_2")(rows)
+    assert batch["input_ids"].tolist() == [[10, 11, 12, 20, 21]]
+    assert batch["position_ids"].tolist() == [[0, 1, 2, 0, 1]]
+    assert "attention_mask" not in batch
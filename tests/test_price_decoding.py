@@ -0,0 +1,80 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+tokenizers = pytest.importorskip("tokenizers")
+
+from price_decoding import PriceVocab, expected_prices, with_prefix  # noqa: E402
+
+PROMPTS = [
+    "what is the price widget price is $",
+    "what is the price of gold cable usb a b c title widget price is $",
+]
+
+
+@pytest.fixture(scope="module")
+def tiny_model():
+    """A randomly initialised GPT-2 with a word-level vocabulary holding every integer below 1000"""
+    vocab = {"[PAD]": 0, "</s>": 1}
+    for word in " ".join(PROMPTS).split() + [str(i) for i in range(1000)] + ["."]:
+        vocab.setdefault(word, len(vocab))
+
+    backend = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token="[PAD]"))
+    backend.pre_tokenizer = tokenizers.pre_tokenizers.WhitespaceSplit()
+    tokenizer = transformers.PreTrainedTokenizerFast(tokenizer_object=backend, pad_token="[PAD]", eos_token="</s>")
+    tokenizer.padding_side = "left"
+
+    # GPT-2 has absolute positions, so misplaced position ids change its logits
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(vocab_size=len(vocab), n_embd=64, n_layer=2, n_head=4, initializer_range=0.5)
+    return transformers.GPT2LMHeadModel(config).eval(), tokenizer
+
+
+def test_expected_prices_batched_matches_unbatched(tiny_model):
+    model, tokenizer = tiny_model
+    vocab = PriceVocab(tokenizer)
+
+    single = [expected_prices(model, tokenizer([prompt], return_tensors="pt"), vocab)[0] for prompt in PROMPTS]
+    batched = expected_prices(model, tokenizer(PROMPTS, return_tensors="pt", padding=True), vocab)
+
+    assert batched == pytest.approx(single, rel=1e-4)
+
+
+def test_offline_evaluation_decodes_through_the_predictor(tiny_model):
+    from evaluate import make_predictors
+    from inference import Predictor
+    from pricer.latency import timed_call
+
+    model, tokenizer = tiny_model
+    predictor = Predictor(loader=lambda: (model, tokenizer), device="cpu", decoding="expected", prefix_cache=False)
+    _, predict_batch = make_predictors(predictor)
+
+    rows = [{"prompt": prompt} for prompt in PROMPTS]
+    values, _, phases = timed_call(predict_batch, rows)
+
+    # The predictor adds the "Price is $" prefix the way serving does
+    prefixed = [with_prefix(prompt) for prompt in PROMPTS]
+    direct = expected_prices(model, tokenizer(prefixed, return_tensors="pt", padding=True), PriceVocab(tokenizer))
+    assert [float(value) for value in values] == pytest.approx(direct, abs=0.01)
+    assert set(phases) == {"tokenize", "forward"}
+
+
+@pytest.mark.parametrize("prompts", [PROMPTS[:1], PROMPTS])
+def test_prefix_cache_serves_left_padded_batches(tiny_model, prompts):
+    from prefix_cache import PrefixCache
+
+    model, tokenizer = tiny_model
+    cache = PrefixCache(model, tokenizer, device="cpu", prefix="what is the price")
+    inputs = tokenizer(prompts, return_tensors="pt", padding=True)
+    prompt_len = inputs["input_ids"].shape[1]
+
+    with torch.inference_mode():
+        plain = model.generate(**inputs, max_new_tokens=4, do_sample=False, pad_token_id=0)
+        cached = model.generate(**cache.generate_inputs(inputs), max_new_tokens=4, do_sample=False, pad_token_id=0)
+    assert cached[:, prompt_len:].tolist() == plain[:, prompt_len:].tolist()
+
+    vocab = PriceVocab(tokenizer)
+    assert expected_prices(model, cache.forward_inputs(inputs), vocab) == pytest.approx(
+        expected_prices(model, inputs, vocab), rel=1e-4
+    )
+    assert cache.stats()["prefix_cache_hit_rate"] == 1.0
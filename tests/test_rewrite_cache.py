@@ -0,0 +1,80 @@
+import threading
+
+from rewrite_cache import RewriteCache, cache_key
+
+
+def make_cache(directory=None, capacity=2, **kwargs):
+    return RewriteCache(directory, capacity=capacity, commit_interval=60, reload_interval=0, **kwargs)
+
+
+def test_cache_key_ignores_whitespace():
+    assert cache_key("a  b\nc", "system", "model") == cache_key(" a b c ", "system", "model")
+    assert cache_key("a b c", "system", "model") != cache_key("a b c", "system", "other-model")
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = make_cache()
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats()["rewrite_cache_misses"] == 1
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    make_cache(tmp_path).put("key", "rewrite")
+
+    cache = make_cache(tmp_path)
+    assert cache.get("key") == "rewrite"
+    assert cache.get("key") == "rewrite"
+    stats = cache.stats()
+    assert (stats["rewrite_cache_disk_hits"], stats["rewrite_cache_memory_hits"]) == (1, 1)
+
+
+def test_put_does_not_commit_until_flush_or_close(tmp_path):
+    commits = []
+    cache = make_cache(tmp_path, commit=lambda: commits.append(1))
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert commits == []
+
+    cache.flush()
+    cache.flush()  # nothing new to publish
+    assert commits == [1]
+
+    cache.put("c", "C")
+    cache.close()
+    assert commits == [1, 1]
+
+
+def test_background_thread_commits_pending_writes(tmp_path):
+    committed = threading.Event()
+    cache = RewriteCache(tmp_path, capacity=2, commit=committed.set, commit_interval=0.01, reload_interval=0)
+    cache.put("a", "A")
+    assert committed.wait(timeout=5)
+    cache.close()
+
+
+def test_disk_miss_reloads_to_see_other_writers(tmp_path):
+    writer = make_cache(tmp_path / "shared")
+    reloads = []
+
+    def reload():
+        # Stands in for volume.reload(): another container's commit becomes visible
+        reloads.append(1)
+        writer.put("key", "from another container")
+
+    cache = make_cache(tmp_path / "shared", reload=reload)
+    assert cache.get("key") == "from another container"
+    assert reloads == [1]
+
+
+def test_reload_is_rate_limited(tmp_path):
+    reloads = []
+    cache = RewriteCache(tmp_path, capacity=2, reload=lambda: reloads.append(1), commit_interval=60, reload_interval=3600)
+    assert cache.get("missing") is None
+    assert reloads == []
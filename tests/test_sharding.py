@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("plotly")
+
+from pricer.evaluate import Tester, merge_shards, run_shard, shard_indices, shard_path
+
+ITEMS = [SimpleNamespace(title=f"Item {i}", price=float(10 + i * 7 % 90)) for i in range(23)]
+
+
+def guess(item):
+    return item.price * 1.2 + 1
+
+
+def test_shards_cover_every_index_once_in_order():
+    for total, num_shards in [(23, 4), (5, 8), (0, 3), (100, 1)]:
+        shards = [shard_indices(total, num_shards, shard) for shard in range(num_shards)]
+        assert sum(shards, []) == list(range(total))
+
+
+def test_shard_out_of_range_is_rejected():
+    with pytest.raises(ValueError):
+        shard_indices(10, 4, 4)
+
+
+def test_merged_shards_match_an_unsharded_run(tmp_path):
+    for shard in range(3):
+        run_shard(guess, ITEMS, shard, 3, tmp_path / "shards", workers=2, title="guess")
+
+    merged = merge_shards(tmp_path / "shards", output_dir=tmp_path / "merged")
+    whole = Tester(guess, ITEMS, size=len(ITEMS), workers=2, title="guess")
+    whole.collect()
+
+    assert merged.indices == list(range(len(ITEMS)))
+    assert merged.guesses == whole.guesses
+    assert merged.errors == whole.errors
+    for key in ("size", "avg_error", "mse", "r2", "colors"):
+        assert merged.metrics()[key] == whole.metrics()[key]
+    assert (tmp_path / "merged" / "metrics.json").exists()
+
+
+def test_merge_reports_missing_shards(tmp_path):
+    run_shard(guess, ITEMS, 0, 2, tmp_path, workers=1)
+    assert shard_path(tmp_path, 0, 2).exists()
+    with pytest.raises(ValueError, match="Missing results for shards \\[1\\]"):
+        merge_shards(tmp_path)
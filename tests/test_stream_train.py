@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("sklearn")
+
+from pricer.stream_train import StreamTrainer, is_holdout, split_holdout
+
+
+def category(name, n):
+    return [{"title": f"{name} {i}", "description": f"{name} product number {i}", "price": 10.0 + i % 50} for i in range(n)]
+
+
+def test_holdout_spans_every_category_and_is_stable_across_epochs():
+    records = category("Appliances", 2_000) + category("Electronics", 2_000)
+
+    holdout = []
+    trained = list(split_holdout(records, every=20, limit=50, holdout=holdout))
+    assert len(holdout) == 50
+    assert {record["title"].split()[0] for record in holdout} == {"Appliances", "Electronics"}
+
+    again = list(split_holdout(records, every=20, limit=50))
+    assert again == trained
+    assert not any(is_holdout(record, 20) for record in trained)
+    assert len(trained) + sum(is_holdout(record, 20) for record in records) == len(records)
+
+
+def test_held_out_records_are_never_trained_on():
+    records = category("Toys", 600)
+    trainer = StreamTrainer(batch_size=64, buffer_size=256).fit(lambda: iter(records), epochs=2, holdout_every=10, eval_size=1_000)
+
+    held = sum(is_holdout(record, 10) for record in records)
+    assert len(trainer.holdout) == held
+    assert trainer.rows == 2 * (len(records) - held)
+    assert [row.title for row in trainer.holdout_rows()] == [record["title"] for record in trainer.holdout]